@@ -3,25 +3,78 @@ Atlas Terminal - User Authentication Module
 JWT-based authentication with SQLite database
 """
 
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
+from cachetools import LRUCache, TTLCache
+from jose import JOSEError, jwk, jws, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
 import sqlite3
+import asyncio
+import queue
+import orjson
 import os
 import secrets
+import hashlib
+import hmac
+import importlib.util
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
 
 # Security Configuration
 SECRET_KEY = os.environ.get("SECRET_KEY", secrets.token_urlsafe(32))
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Signing key built once; jwt.decode() would re-wrap SECRET_KEY on every call
+_JWT_KEY = jwk.construct(SECRET_KEY, ALGORITHM)
+
+# Hashing cost: BCRYPT_ROUNDS=4 keeps tests fast, production should stay at 12 or above
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", 12))
+
+# New hashes use argon2id when argon2-cffi is installed; existing bcrypt hashes keep verifying
+if importlib.util.find_spec("argon2") is not None:
+    PASSWORD_SCHEMES = ["argon2", "bcrypt"]
+else:
+    logger.warning("argon2-cffi not installed - hashing new passwords with bcrypt")
+    PASSWORD_SCHEMES = ["bcrypt"]
+
+pwd_context = CryptContext(
+    schemes=PASSWORD_SCHEMES,
+    deprecated="auto",
+    bcrypt__rounds=BCRYPT_ROUNDS,
+    argon2__rounds=3,
+    argon2__memory_cost=65536,
+)
 security = HTTPBearer()
 
+# argon2 allocates 64 MiB per hash; with a 200-thread pool, unbounded /login traffic could run
+# hundreds at once. Cap concurrent hashes/verifications at roughly one per core.
+PASSWORD_HASH_CONCURRENCY = int(os.environ.get("PASSWORD_HASH_CONCURRENCY", os.cpu_count() or 1))
+_HASH_SEMAPHORE = threading.BoundedSemaphore(PASSWORD_HASH_CONCURRENCY)
+
+# Validated tokens: raw JWT -> (User, exp). Only successfully verified tokens are stored.
+_JWT_CACHE = TTLCache(maxsize=10_000, ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+# Public user records by username, so a fresh token (e.g. right after login) skips the DB lookup
+_USER_CACHE = TTLCache(maxsize=4096, ttl=60)
+
+# Parsed user settings by username; dashboards poll these far more often than they change
+_SETTINGS_CACHE = TTLCache(maxsize=4096, ttl=30)
+
+# Successful password checks, keyed by a per-process HMAC of (password, hash) so plaintext is never kept
+_VERIFY_CACHE = LRUCache(maxsize=4096)
+_VERIFY_CACHE_KEY = secrets.token_bytes(32)
+
+# cachetools caches are not thread-safe; sync handlers touch them from FastAPI's threadpool
+_CACHE_LOCK = threading.Lock()
+
 # Pydantic Models
 class Token(BaseModel):
     access_token: str
@@ -40,6 +93,10 @@ class User(BaseModel):
 class UserInDB(User):
     hashed_password: str
 
+class UserOverview(User):
+    widget_count: int = 0
+    watchlist_count: int = 0
+
 class UserCreate(BaseModel):
     username: str
     password: str
@@ -54,9 +111,185 @@ class UserLogin(BaseModel):
 # Database path
 DB_PATH = os.path.join(os.path.dirname(__file__), "atlas_users.db")
 
+# Applied once per pooled connection: WAL journal, one fsync per checkpoint instead of per
+# commit, wait up to 5 s on a locked DB instead of failing, in-memory temp tables, 64 MB
+# page cache, 256 MB memory-mapped reads and enforced foreign keys
+SQLITE_PRAGMAS = (
+    "journal_mode=WAL",
+    "synchronous=NORMAL",
+    "busy_timeout=5000",
+    "temp_store=MEMORY",
+    "cache_size=-64000",
+    "mmap_size=268435456",
+    "foreign_keys=ON",
+)
+
+# Prepared statements kept per connection (sqlite3 default is 128)
+SQLITE_CACHED_STATEMENTS = 256
+
+# Log every executed statement - debugging only, costs a Python callback per statement
+SQLITE_TRACE = bool(os.environ.get("SQLITE_TRACE"))
+
+def _create_connection(read_only: bool = False) -> sqlite3.Connection:
+    """Open a SQLite connection configured for pooled use"""
+    if read_only:
+        conn = sqlite3.connect(
+            f"file:{DB_PATH}?mode=ro", uri=True, check_same_thread=False,
+            cached_statements=SQLITE_CACHED_STATEMENTS,
+        )
+    else:
+        conn = sqlite3.connect(
+            DB_PATH, check_same_thread=False, cached_statements=SQLITE_CACHED_STATEMENTS
+        )
+    conn.row_factory = sqlite3.Row  # rows index by position and by column name
+    if SQLITE_TRACE:
+        conn.set_trace_callback(logger.debug)
+    for pragma in SQLITE_PRAGMAS:
+        conn.execute(f"PRAGMA {pragma}")
+    return conn
+
+class ConnectionPool:
+    """Fixed-size pool of SQLite connections handed out through a queue"""
+
+    def __init__(self, size: int, read_only: bool = False):
+        self.size = size
+        self.read_only = read_only
+        self.opened = False
+        self._queue: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=size)
+        self._lock = threading.Lock()
+
+    def open(self):
+        """Fill the pool (no-op if already open)"""
+        with self._lock:
+            if self.opened:
+                return
+            for _ in range(self.size):
+                self._queue.put(_create_connection(self.read_only))
+            self.opened = True
+
+    def close(self):
+        """Close all idle connections"""
+        with self._lock:
+            while True:
+                try:
+                    conn = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                conn.close()
+            self.opened = False
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection (blocking while all are in use) and return it afterwards"""
+        conn = self._queue.get()
+        try:
+            yield conn
+        finally:
+            # Never hand out a connection with an open transaction (e.g. after a cancelled
+            # request that skipped the caller's rollback); the slot is ours, so put never blocks
+            if conn.in_transaction:
+                conn.rollback()
+            self._queue.put_nowait(conn)
+
+# Connection pools (shared across requests, avoids reopening the DB file per call).
+# WAL lets readers run alongside the writer, so reads get a pool of read-only
+# connections and all writes are serialized through a pool of one.
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", os.cpu_count() or 4))
+_READ_POOL = ConnectionPool(DB_POOL_SIZE, read_only=True)
+_WRITE_POOL = ConnectionPool(1)
+
+def init_pool():
+    """Open the write connection and fill the read pool (no-op if already initialized)"""
+    # Writer first: it creates the DB file and switches it to WAL before readers attach
+    _WRITE_POOL.open()
+    _READ_POOL.open()
+
+def close_pool():
+    """Close the write connection and all idle read connections"""
+    _READ_POOL.close()
+    _WRITE_POOL.close()
+
+@contextmanager
+def get_read_conn():
+    """Check out a read-only pooled connection and return it to the pool afterwards"""
+    if not _READ_POOL.opened:
+        init_pool()
+    with _READ_POOL.connection() as conn:
+        yield conn
+
+@contextmanager
+def get_write_conn():
+    """Hold the single write connection inside one transaction: committed on success, rolled back on error"""
+    if not _WRITE_POOL.opened:
+        init_pool()
+    with _WRITE_POOL.connection() as conn:
+        # Take the write lock up front so other processes' writers queue on busy_timeout
+        # instead of failing with SQLITE_BUSY when a read transaction tries to upgrade
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except Exception:
+            conn.rollback()
+            raise
+        if conn.in_transaction:
+            conn.commit()
+
 def init_database():
     """Initialize SQLite database for users"""
-    conn = sqlite3.connect(DB_PATH)
+    init_pool()
+    with get_write_conn() as conn:
+        _create_tables(conn)
+
+# widget_config is served to clients verbatim (orjson.Fragment), so SQLite rejects invalid JSON on write
+USER_WIDGETS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT NOT NULL,
+        widget_type TEXT NOT NULL,
+        widget_config TEXT CHECK (widget_config IS NULL OR json_valid(widget_config)),
+        position_x INTEGER,
+        position_y INTEGER,
+        width INTEGER,
+        height INTEGER,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (username) REFERENCES users(username)
+    )
+"""
+
+def _migrate_user_widgets(cursor: sqlite3.Cursor):
+    """Rebuild a pre-JSON1 user_widgets table with the json_valid CHECK (one-off)"""
+    table_sql = cursor.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'user_widgets'"
+    ).fetchone()[0]
+    if "json_valid" in table_sql:
+        return
+
+    cursor.execute("DROP TABLE IF EXISTS user_widgets_new")
+    cursor.execute(USER_WIDGETS_SCHEMA.format(table="user_widgets_new"))
+
+    # Foreign keys were not enforced before; widgets of deleted users cannot be copied into
+    # the new table (the INSERT would fail the FK check and abort startup), so they are dropped
+    orphaned = cursor.execute(
+        "SELECT COUNT(*) FROM user_widgets WHERE username NOT IN (SELECT username FROM users)"
+    ).fetchone()[0]
+    if orphaned:
+        logger.warning(f"user_widgets migration: dropping {orphaned} widgets of deleted users")
+
+    # Alte Blob-/Textwerte als Text übernehmen, ungültiges JSON wird zu NULL
+    cursor.execute("""
+        INSERT INTO user_widgets_new
+            (id, username, widget_type, widget_config, position_x, position_y, width, height, created_at)
+        SELECT id, username, widget_type,
+               CASE WHEN json_valid(CAST(widget_config AS TEXT)) THEN CAST(widget_config AS TEXT) END,
+               position_x, position_y, width, height, created_at
+        FROM user_widgets
+        WHERE username IN (SELECT username FROM users)
+    """)
+    cursor.execute("DROP TABLE user_widgets")
+    cursor.execute("ALTER TABLE user_widgets_new RENAME TO user_widgets")
+
+def _create_tables(conn: sqlite3.Connection):
+    """Create tables if they do not exist yet"""
     cursor = conn.cursor()
 
     # Create users table
@@ -88,45 +321,85 @@ def init_database():
     """)
 
     # Create user_widgets table for dashboard configuration
+    cursor.execute(USER_WIDGETS_SCHEMA.format(table="user_widgets"))
+    _migrate_user_widgets(cursor)
+
+    # Cached OHLC downloads (pickled DataFrames), keyed by request parameters
     cursor.execute("""
-        CREATE TABLE IF NOT EXISTS user_widgets (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT NOT NULL,
-            widget_type TEXT NOT NULL,
-            widget_config TEXT,
-            position_x INTEGER,
-            position_y INTEGER,
-            width INTEGER,
-            height INTEGER,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (username) REFERENCES users(username)
+        CREATE TABLE IF NOT EXISTS ohlc_cache (
+            symbol TEXT NOT NULL,
+            timeframe TEXT NOT NULL,
+            period TEXT NOT NULL,
+            fetched_at INTEGER NOT NULL,
+            payload BLOB NOT NULL,
+            PRIMARY KEY (symbol, timeframe, period)
         )
     """)
 
+    # Compound indexes: per-user lookups come back already sorted (kein extra Sort-Schritt).
+    # They cover the username prefix, so the old single-column indexes are redundant.
+    cursor.execute("DROP INDEX IF EXISTS idx_watchlist_username")
+    cursor.execute("DROP INDEX IF EXISTS idx_user_widgets_username")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_watchlist_user_added ON watchlist(username, added_at DESC)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_widgets_user_id ON user_widgets(username, id)")
+
+    # One entry per symbol and user; legacy duplicates are dropped once, before the index exists
+    has_unique_index = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_watchlist_user_symbol'"
+    ).fetchone()
+    if not has_unique_index:
+        cursor.execute("""
+            DELETE FROM watchlist
+            WHERE id NOT IN (SELECT MIN(id) FROM watchlist GROUP BY username, symbol)
+        """)
+        if cursor.rowcount:
+            logger.warning(f"watchlist migration: removed {cursor.rowcount} duplicate entries")
+        cursor.execute("CREATE UNIQUE INDEX idx_watchlist_user_symbol ON watchlist(username, symbol)")
+
+    # Rows written before foreign keys were enforced may still point at deleted users
+    violations = cursor.execute("PRAGMA foreign_key_check").fetchall()
+    if violations:
+        per_table = {}
+        for violation in violations:
+            per_table[violation[0]] = per_table.get(violation[0], 0) + 1
+        logger.warning(f"Foreign key check: orphaned rows per table {per_table}")
+
     conn.commit()
-    conn.close()
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify password hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    """Verify password hash (bcrypt only runs on cache miss)"""
+    digest = hmac.new(
+        _VERIFY_CACHE_KEY, f"{plain_password}\0{hashed_password}".encode(), hashlib.sha256
+    ).digest()
+    with _CACHE_LOCK:
+        if digest in _VERIFY_CACHE:
+            return True
+
+    with _HASH_SEMAPHORE:
+        verified = pwd_context.verify(plain_password, hashed_password)
+    if verified:
+        with _CACHE_LOCK:
+            _VERIFY_CACHE[digest] = True
+        return True
+    return False
 
 def get_password_hash(password: str) -> str:
     """Hash password"""
-    return pwd_context.hash(password)
+    with _HASH_SEMAPHORE:
+        return pwd_context.hash(password)
 
 def get_user(username: str) -> Optional[UserInDB]:
     """Get user from database"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    with get_read_conn() as conn:
+        cursor = conn.cursor()
 
-    cursor.execute("""
-        SELECT username, hashed_password, email, full_name, disabled, is_admin
-        FROM users
-        WHERE username = ?
-    """, (username,))
+        cursor.execute("""
+            SELECT username, hashed_password, email, full_name, disabled, is_admin
+            FROM users
+            WHERE username = ?
+        """, (username,))
 
-    row = cursor.fetchone()
-    conn.close()
+        row = cursor.fetchone()
 
     if row:
         return UserInDB(
@@ -139,6 +412,27 @@ def get_user(username: str) -> Optional[UserInDB]:
         )
     return None
 
+# last_login updates are queued per login and written in batches by flush_last_logins()
+LAST_LOGIN_FLUSH_INTERVAL = 5  # seconds
+_PENDING_LOGINS: dict = {}
+_PENDING_LOGINS_LOCK = threading.Lock()
+
+def flush_last_logins():
+    """Write queued last_login timestamps in a single transaction"""
+    with _PENDING_LOGINS_LOCK:
+        if not _PENDING_LOGINS:
+            return
+        pending = [(ts, username) for username, ts in _PENDING_LOGINS.items()]
+        _PENDING_LOGINS.clear()
+
+    with get_write_conn() as conn:
+        with conn:
+            conn.executemany("""
+                UPDATE users
+                SET last_login = ?
+                WHERE username = ?
+            """, pending)
+
 def authenticate_user(username: str, password: str) -> Optional[UserInDB]:
     """Authenticate user with username and password"""
     user = get_user(username)
@@ -147,19 +441,26 @@ def authenticate_user(username: str, password: str) -> Optional[UserInDB]:
     if not verify_password(password, user.hashed_password):
         return None
 
-    # Update last login
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("""
-        UPDATE users
-        SET last_login = ?
-        WHERE username = ?
-    """, (datetime.now(), username))
-    conn.commit()
-    conn.close()
+    # Update last login (written by the next flush_last_logins() batch)
+    with _PENDING_LOGINS_LOCK:
+        _PENDING_LOGINS[username] = datetime.now()
+
+    # The client's first request with its new token will need this record
+    with _CACHE_LOCK:
+        _USER_CACHE[username] = _public_user(user)
 
     return user
 
+def _public_user(user: UserInDB) -> User:
+    """Strip the password hash from a DB user"""
+    return User(
+        username=user.username,
+        email=user.email,
+        full_name=user.full_name,
+        disabled=user.disabled,
+        is_admin=user.is_admin
+    )
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create JWT access token"""
     to_encode = data.copy()
@@ -179,27 +480,50 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+    token = credentials.credentials
+    with _CACHE_LOCK:
+        cached = _JWT_CACHE.get(token)
+    if cached is not None and cached[1] > time.time():
+        return cached[0]
+
     try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        token_data = TokenData(username=username)
-    except JWTError:
+        # Verify the HS256 signature with the prebuilt key, then check expiry directly
+        payload = orjson.loads(jws.verify(token, _JWT_KEY, ALGORITHM))
+    except (JOSEError, ValueError):
         raise credentials_exception
 
-    user = get_user(username=token_data.username)
-    if user is None:
+    if not isinstance(payload, dict):
+        raise credentials_exception
+    exp = payload.get("exp")
+    if not isinstance(exp, (int, float)) or exp <= time.time():
+        raise credentials_exception
+    username: str = payload.get("sub")
+    if username is None:
         raise credentials_exception
+    token_data = TokenData(username=username)
+
+    with _CACHE_LOCK:
+        current_user = _USER_CACHE.get(token_data.username)
+    if current_user is None:
+        # Pool checkout may block while all read connections are busy - keep it off the event loop
+        user = await asyncio.to_thread(get_user, token_data.username)
+        if user is None:
+            raise credentials_exception
+        current_user = _public_user(user)
 
-    return User(
-        username=user.username,
-        email=user.email,
-        full_name=user.full_name,
-        disabled=user.disabled,
-        is_admin=user.is_admin
-    )
+    with _CACHE_LOCK:
+        _USER_CACHE[current_user.username] = current_user
+        _JWT_CACHE[token] = (current_user, exp)
+
+    return current_user
+
+def invalidate_user_tokens(username: str):
+    """Drop cached tokens and the cached record of a user"""
+    with _CACHE_LOCK:
+        _USER_CACHE.pop(username, None)
+        for token, (cached_user, _) in list(_JWT_CACHE.items()):
+            if cached_user.username == username:
+                _JWT_CACHE.pop(token, None)
 
 async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     """Get current active user"""
@@ -218,31 +542,31 @@ async def get_current_admin_user(current_user: User = Depends(get_current_active
 
 def create_user(user_create: UserCreate) -> User:
     """Create new user in database"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-
-    # Check if user already exists
-    cursor.execute("SELECT username FROM users WHERE username = ?", (user_create.username,))
-    if cursor.fetchone():
-        conn.close()
-        raise ValueError("Username already exists")
-
-    # Hash password and insert user
+    # Hash before taking the write connection: argon2 takes hundreds of ms and would hold the write lock
     hashed_password = get_password_hash(user_create.password)
 
-    cursor.execute("""
-        INSERT INTO users (username, hashed_password, email, full_name, is_admin)
-        VALUES (?, ?, ?, ?, ?)
-    """, (
-        user_create.username,
-        hashed_password,
-        user_create.email,
-        user_create.full_name,
-        1 if user_create.is_admin else 0
-    ))
+    with get_write_conn() as conn:
+        cursor = conn.cursor()
+
+        # Insert user; the UNIQUE constraint on username decides existence atomically
+        cursor.execute("""
+            INSERT INTO users (username, hashed_password, email, full_name, is_admin)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(username) DO NOTHING
+            RETURNING id
+        """, (
+            user_create.username,
+            hashed_password,
+            user_create.email,
+            user_create.full_name,
+            1 if user_create.is_admin else 0
+        ))
+        inserted = cursor.fetchone()
 
-    conn.commit()
-    conn.close()
+        conn.commit()
+
+        if inserted is None:
+            raise ValueError("Username already exists")
 
     return User(
         username=user_create.username,
@@ -252,70 +576,78 @@ def create_user(user_create: UserCreate) -> User:
         is_admin=user_create.is_admin
     )
 
-def get_all_users() -> list[User]:
-    """Get all users (admin only)"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT username, email, full_name, disabled, is_admin
-        FROM users
-        ORDER BY created_at DESC
-    """)
-
-    users = []
-    for row in cursor.fetchall():
-        users.append(User(
-            username=row[0],
-            email=row[1],
-            full_name=row[2],
-            disabled=bool(row[3]),
-            is_admin=bool(row[4])
-        ))
-
-    conn.close()
-    return users
+def get_all_users() -> list[UserOverview]:
+    """Get all users with widget/watchlist counts (admin only)"""
+    # Counts come from correlated subqueries on the (username, ...) indexes, all in one query
+    with get_read_conn() as conn:
+        rows = conn.execute("""
+            SELECT u.username, u.email, u.full_name, u.disabled, u.is_admin,
+                   (SELECT COUNT(*) FROM user_widgets w WHERE w.username = u.username) AS widget_count,
+                   (SELECT COUNT(*) FROM watchlist wl WHERE wl.username = u.username) AS watchlist_count
+            FROM users u
+            ORDER BY u.created_at DESC
+        """).fetchall()
+
+    return [
+        UserOverview(
+            username=row["username"],
+            email=row["email"],
+            full_name=row["full_name"],
+            disabled=bool(row["disabled"]),
+            is_admin=bool(row["is_admin"]),
+            widget_count=row["widget_count"],
+            watchlist_count=row["watchlist_count"]
+        )
+        for row in rows
+    ]
 
 def delete_user(username: str):
     """Delete user from database"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-
-    cursor.execute("DELETE FROM users WHERE username = ?", (username,))
-    cursor.execute("DELETE FROM watchlist WHERE username = ?", (username,))
-    cursor.execute("DELETE FROM user_widgets WHERE username = ?", (username,))
-
-    conn.commit()
-    conn.close()
+    with get_write_conn() as conn:
+        # One transaction (single commit) for all three deletes, rolled back on error
+        with conn:
+            # Child rows first - foreign keys are enforced
+            conn.execute("DELETE FROM watchlist WHERE username = ?", (username,))
+            conn.execute("DELETE FROM user_widgets WHERE username = ?", (username,))
+            conn.execute("DELETE FROM users WHERE username = ?", (username,))
+
+    invalidate_user_tokens(username)
+    with _CACHE_LOCK:
+        _SETTINGS_CACHE.pop(username, None)
 
 def update_user_settings(username: str, settings: dict):
-    """Update user settings (JSON)"""
-    import json
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        UPDATE users
-        SET user_settings = ?
-        WHERE username = ?
-    """, (json.dumps(settings), username))
+    """Update user settings (JSON, stored as orjson bytes)"""
+    with get_write_conn() as conn:
+        cursor = conn.cursor()
 
-    conn.commit()
-    conn.close()
+        cursor.execute("""
+            UPDATE users
+            SET user_settings = ?
+            WHERE username = ?
+        """, (orjson.dumps(settings), username))
 
-def get_user_settings(username: str) -> dict:
-    """Get user settings"""
-    import json
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+        conn.commit()
 
-    cursor.execute("SELECT user_settings FROM users WHERE username = ?", (username,))
-    row = cursor.fetchone()
-    conn.close()
+    with _CACHE_LOCK:
+        _SETTINGS_CACHE.pop(username, None)
 
-    if row and row[0]:
-        return json.loads(row[0])
-    return {}
+def get_user_settings(username: str) -> dict:
+    """Get user settings (cached for 30 s, dropped on update)"""
+    with _CACHE_LOCK:
+        settings = _SETTINGS_CACHE.get(username)
+    if settings is not None:
+        return settings
+
+    with get_read_conn() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute("SELECT user_settings FROM users WHERE username = ?", (username,))
+        row = cursor.fetchone()
+
+    settings = orjson.loads(row[0]) if row and row[0] else {}  # accepts legacy TEXT rows as well as BLOBs
+    with _CACHE_LOCK:
+        _SETTINGS_CACHE[username] = settings
+    return settings
 
 # Initialize database on module import
 init_database()
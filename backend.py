@@ -3,34 +3,62 @@ Atlas Terminal Backend - FastAPI Integration
 Integriert den Probability Analyzer für das Atlas Terminal
 """
 
-from fastapi import FastAPI, HTTPException, UploadFile, File, Depends
+from fastapi import FastAPI, HTTPException, UploadFile, File, Depends, Header, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 import io
-from typing import List, Dict, Optional, Any
+from typing import IO, List, Dict, Optional, Any, Tuple
+from functools import lru_cache
+from heapq import nlargest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
 import pandas as pd
 import numpy as np
-import yfinance as yf
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import sys
 import os
 import json
+import orjson
+import hashlib
+import gzip
+import re
+import random
+import warnings
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import sqlite3
+import pickle
+import asyncio
+import anyio
+import threading
+import httpx
+import time
+from cachetools import LRUCache, TTLCache
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
 
 # Import authentication module
 from auth import (
-    Token, User, UserCreate, UserLogin, TokenData,
+    Token, User, UserCreate, UserLogin, TokenData, UserOverview,
     authenticate_user, create_access_token, get_current_active_user,
     get_current_admin_user, create_user, get_all_users, delete_user,
     get_user_settings, update_user_settings, init_database,
-    ACCESS_TOKEN_EXPIRE_MINUTES, DB_PATH
+    init_pool, close_pool, flush_last_logins, LAST_LOGIN_FLUSH_INTERVAL,
+    ACCESS_TOKEN_EXPIRE_MINUTES, get_read_conn, get_write_conn
 )
 
 # Import data sources
-from data_sources import get_historical_data
+from data_sources import get_historical_data, fetch_yfinance_history, USER_AGENTS
 
 # Import yield spread analyzer
 from yield_spread_analyzer import get_analyzer
@@ -42,11 +70,20 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '../../Prob_Analyzer'))
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Worker threads for plain `def` endpoints (SQLite/bcrypt handlers); anyio's default is 40.
+# Password hashing inside them is capped separately by auth.PASSWORD_HASH_CONCURRENCY.
+THREADPOOL_SIZE = int(os.environ.get("THREADPOOL_SIZE", 200))
+
+# Worker processes for yfinance downloads (CPU-bound parsing, would serialize on the GIL in threads).
+# Kept small until threads vs. processes has been measured - each worker is a full interpreter.
+YF_PROCESS_WORKERS = int(os.environ.get("YF_PROCESS_WORKERS", 2))
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Atlas Terminal API",
     description="Backend API für Atlas Terminal mit Probability Analyzer",
-    version="1.1.2"
+    version="1.1.2",
+    default_response_class=ORJSONResponse
 )
 
 # CORS Middleware - Allow all origins for public access
@@ -58,6 +95,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger JSON responses (pattern_details, news, asset lists)
+GZIP_LEVEL = 5
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=GZIP_LEVEL)
+
 # Symbol Mapping for different data sources
 SYMBOL_ALIASES = {
     # Forex pairs
@@ -135,13 +176,26 @@ SYMBOL_CONVERSIONS = {
     }
 }
 
+# Flat (symbol, source) -> converted symbol table, built once at import
+_SYMBOL_XLAT = {
+    (symbol, source): converted
+    for symbol, conversions in SYMBOL_CONVERSIONS.items()
+    for source, converted in conversions.items()
+}
+_SYMBOL_SUFFIXES = re.compile(r'=X|=F|\^')
+
 def convert_symbol_for_source(symbol: str, source: str) -> str:
     """Convert Yahoo Finance symbol to format needed by alternative source"""
+    converted = _SYMBOL_XLAT.get((symbol, source))
+    if converted is not None:
+        return converted
     if symbol in SYMBOL_CONVERSIONS:
-        return SYMBOL_CONVERSIONS[symbol].get(source, symbol)
+        return symbol
+    return _fallback_symbol(symbol, source)
 
-    # Fallback: Basic conversion logic
-    clean_symbol = symbol.replace('=X', '').replace('=F', '').replace('^', '')
+def _fallback_symbol(symbol: str, source: str) -> str:
+    """Basic conversion for symbols without an explicit mapping"""
+    clean_symbol = _SYMBOL_SUFFIXES.sub('', symbol)
 
     if source == "alphavantage":
         return clean_symbol
@@ -189,12 +243,22 @@ TIMEFRAMES = {
     "1mo": "Monthly"
 }
 
+# Konstant pro Deployment - einmal serialisieren, ETag aus dem Inhalt
+STATIC_CACHE_CONTROL = "public, max-age=3600"
+ASSETS_JSON = orjson.dumps(ASSETS)
+ASSETS_JSON_GZ = gzip.compress(ASSETS_JSON, GZIP_LEVEL)
+ASSETS_ETAG = '"' + hashlib.blake2b(ASSETS_JSON, digest_size=16).hexdigest() + '"'
+TIMEFRAMES_JSON = orjson.dumps(TIMEFRAMES)
+TIMEFRAMES_JSON_GZ = gzip.compress(TIMEFRAMES_JSON, GZIP_LEVEL)
+TIMEFRAMES_ETAG = '"' + hashlib.blake2b(TIMEFRAMES_JSON, digest_size=16).hexdigest() + '"'
+
 # Pydantic Models
 class PatternRequest(BaseModel):
     pattern: List[str]
     symbol: str
     timeframe: str = "1d"
     period: str = "5y"
+    include_details: bool = False
 
 class AnalysisResponse(BaseModel):
     total_matches: int
@@ -207,41 +271,300 @@ class AnalysisResponse(BaseModel):
     pattern: List[str]
     data_info: Dict[str, Any]
 
+class CircuitBreaker:
+    """Skip a data source for a while after repeated consecutive failures"""
+
+    def __init__(self, max_failures: int = 3, reset_after: float = 60.0, max_keys: int = 4096):
+        self.max_failures = max_failures
+        self.reset_after = reset_after  # seconds
+        # Keys include user-supplied symbols - bounded and self-expiring so they can't pile up.
+        # A failure streak older than reset_after is forgotten, an open circuit closes on expiry.
+        self._fail_count: TTLCache = TTLCache(maxsize=max_keys, ttl=reset_after)
+        self._open: TTLCache = TTLCache(maxsize=max_keys, ttl=reset_after)
+        self._lock = threading.Lock()
+
+    def is_open(self, name: str) -> bool:
+        """True while the source should not be called"""
+        with self._lock:
+            return name in self._open
+
+    def record_success(self, name: str):
+        """Close the circuit and reset the failure streak"""
+        with self._lock:
+            self._fail_count.pop(name, None)
+            self._open.pop(name, None)
+
+    def record_failure(self, name: str):
+        """Count a failure and open the circuit after max_failures in a row"""
+        with self._lock:
+            count = self._fail_count.get(name, 0) + 1
+            if count >= self.max_failures:
+                self._open[name] = True
+                self._fail_count.pop(name, None)
+                logger.warning(f"Circuit open for {name}: skipping it for {self.reset_after:.0f}s")
+            else:
+                self._fail_count[name] = count
+
+# One breaker shared by yfinance and all alternative OHLC sources. yfinance is keyed by source
+# and only counts exceptions; the alternative sources swallow their errors and return an empty
+# frame, so they are keyed by "source:symbol" - a bad symbol must not cut off everyone else.
+_SOURCE_BREAKER = CircuitBreaker()
+
+# Per-source request parameters for the OHLC fallbacks
+PERIOD_DAYS = {'1y': 365, '2y': 730, '5y': 1825, '10y': 3650}
+YAHOO_INTERVALS = {'1d': '1d', '1wk': '1wk', '1mo': '1mo'}
+TWELVEDATA_INTERVALS = {'1d': '1day', '1wk': '1week', '1mo': '1month'}
+ALPHAVANTAGE_FUNCTIONS = {'1d': 'TIME_SERIES_DAILY', '1wk': 'TIME_SERIES_WEEKLY', '1mo': 'TIME_SERIES_MONTHLY'}
+ALPHAVANTAGE_FX_FUNCTIONS = {'1d': 'FX_DAILY', '1wk': 'FX_WEEKLY', '1mo': 'FX_MONTHLY'}
+
+# Columns kept from Yahoo's CSV download
+YAHOO_CSV_COLUMNS = {'Date', 'Open', 'High', 'Low', 'Close', 'Volume'}
+
+@lru_cache(maxsize=None)
+def _yfinance():
+    """Import yfinance on first use; it is only needed for live downloads and slows down cold starts"""
+    import yfinance
+    return yfinance
+
+# Shared HTTP session: keep-alive connection pool reused by all data-source fallbacks
+_HTTP = requests.Session()
+_HTTP.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=Retry(total=0)))
+_HTTP.headers.update({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
+    'Accept-Language': 'en-US,en;q=0.9'
+})
+
+# Shared async client for handlers on the event loop (news, quotes, FRED): keeps TLS/HTTP/2
+# connections to NewsAPI, Alpha Vantage, Yahoo and FRED alive between requests.
+# Idle connections live for a minute so periodic dashboard polls skip the handshake.
+_ASYNC_HTTP = httpx.AsyncClient(
+    timeout=10,
+    http2=True,
+    limits=httpx.Limits(max_connections=64, max_keepalive_connections=16, keepalive_expiry=60)
+)
+
 # Global Analyzer Instance
 analyzer_instance = None
 
+# Integer encoding of candle types used for vectorized pattern search
+CANDLE_TYPES = ['Doji', 'Bullish', 'Bearish']
+CANDLE_CODES = {name: code for code, name in enumerate(CANDLE_TYPES)}
+
+def classify_candles(price_change: np.ndarray) -> pd.Categorical:
+    """Classify candles by price change as a Categorical backed by int8 codes"""
+    # Bool-Masken direkt als int8 lesen (kein Kopieren) - Doji ist Code 0, NaN zählt als Doji
+    bullish = (price_change > 0).view(np.int8)
+    bearish = (price_change < 0).view(np.int8)
+    codes = bullish * np.int8(CANDLE_CODES['Bullish']) + bearish * np.int8(CANDLE_CODES['Bearish'])
+    return pd.Categorical.from_codes(codes, categories=CANDLE_TYPES)
+
+OHLC_COLUMNS = ['Open', 'High', 'Low', 'Close']
+
+def add_candle_columns(data: pd.DataFrame, decimal_places: int) -> pd.DataFrame:
+    """Round OHLC and add Price_Change/Candle_Type from one float64 block; stored as float32"""
+    # Ein Block statt Spalte für Spalte: runden, Differenz, Klassifizierung auf denselben Arrays
+    prices = data[OHLC_COLUMNS].to_numpy(dtype=np.float64, copy=True)
+    np.round(prices, decimal_places, out=prices)
+    price_change = prices[:, 3] - prices[:, 0]
+    np.round(price_change, decimal_places, out=price_change)
+
+    # Classification above runs in float64 (index prices need it for 2-decimal rounding);
+    # the stored columns are only kept for reference, so float32 halves their footprint
+    data[OHLC_COLUMNS] = prices.astype(np.float32)
+    data['Price_Change'] = price_change.astype(np.float32)
+    data['Candle_Type'] = classify_candles(price_change)
+    return data
+
+# Patterns up to this length are answered from a precomputed window index
+# (3**4 = 81 possible keys) instead of rescanning the codes on every query
+PATTERN_INDEX_MAX_LENGTH = 4
+CANDLE_KEY_BASE = len(CANDLE_TYPES)
+
+@lru_cache(maxsize=256)
+def _encode_pattern(pattern: Tuple[str, ...]) -> np.ndarray:
+    """Encode candle names as int8 codes; unknown names map to -1 and never match"""
+    codes = np.fromiter((CANDLE_CODES.get(p, -1) for p in pattern), dtype=np.int8, count=len(pattern))
+    codes.setflags(write=False)  # shared between callers via the cache
+    return codes
+
+def _scan_pattern(codes: np.ndarray, pattern_codes: np.ndarray) -> np.ndarray:
+    """Scalar pattern scan returning end indices of matches (JIT-compiled when numba is installed)"""
+    length = pattern_codes.size
+    n_windows = codes.size - length  # last candle excluded so each match has a successor
+    out = np.empty(max(n_windows, 0), np.int64)
+    k = 0
+    for i in range(n_windows):
+        matched = True
+        for j in range(length):
+            if codes[i + j] != pattern_codes[j]:
+                matched = False
+                break
+        if matched:
+            out[k] = i + length - 1
+            k += 1
+    return out[:k]
+
+if NUMBA_AVAILABLE:
+    _scan_pattern = njit(cache=True, boundscheck=False)(_scan_pattern)
+
+def warm_up_pattern_scan():
+    """Compile the numba kernel for the array types find_patterns() passes in, so the first request doesn't pay for it"""
+    if NUMBA_AVAILABLE:
+        codes = classify_candles(np.array([1.0, -1.0, 0.0])).codes
+        _scan_pattern(codes, _encode_pattern(('Bullish',)))
+
+# Raw OHLC downloads cached in SQLite; history barely moves, only the latest bar does
+OHLC_CACHE_TTL = {"1d": 300, "1wk": 3600, "1mo": 3600}  # seconds
+OHLC_CACHE_DEFAULT_TTL = 300
+
+def read_ohlc_cache(symbol: str, timeframe: str, period: str) -> Optional[pd.DataFrame]:
+    """Return cached OHLC data if it is younger than the timeframe's TTL"""
+    try:
+        with get_read_conn() as conn:
+            row = conn.execute(
+                "SELECT payload, fetched_at FROM ohlc_cache WHERE symbol = ? AND timeframe = ? AND period = ?",
+                (symbol, timeframe, period)
+            ).fetchone()
+    except sqlite3.Error as e:
+        logger.warning(f"OHLC cache read failed for {symbol}: {e}")
+        return None
+
+    if row is None or time.time() - row[1] >= OHLC_CACHE_TTL.get(timeframe, OHLC_CACHE_DEFAULT_TTL):
+        return None
+    try:
+        return pickle.loads(row[0])
+    except Exception as e:
+        # Corrupt row or pickled by an incompatible pandas version: drop it and download again
+        logger.warning(f"OHLC cache entry for {symbol} unreadable, discarding: {e}")
+        try:
+            with get_write_conn() as conn:
+                conn.execute(
+                    "DELETE FROM ohlc_cache WHERE symbol = ? AND timeframe = ? AND period = ?",
+                    (symbol, timeframe, period)
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"OHLC cache delete failed for {symbol}: {e}")
+        return None
+
+def write_ohlc_cache(symbol: str, timeframe: str, period: str, data: pd.DataFrame):
+    """Store freshly downloaded OHLC data; failures only cost the next request a download"""
+    try:
+        with get_write_conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO ohlc_cache (symbol, timeframe, period, fetched_at, payload) VALUES (?, ?, ?, ?, ?)",
+                (symbol, timeframe, period, int(time.time()), pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+            )
+            conn.commit()
+    except sqlite3.Error as e:
+        logger.warning(f"OHLC cache write failed for {symbol}: {e}")
+
+# Expired entries are never read again; drop them so the pickled frames don't pile up in the DB
+OHLC_CACHE_PRUNE_INTERVAL = 3600  # seconds
+
+def prune_ohlc_cache():
+    """Delete OHLC cache rows older than the longest TTL"""
+    max_ttl = max(OHLC_CACHE_DEFAULT_TTL, *OHLC_CACHE_TTL.values())
+    try:
+        with get_write_conn() as conn:
+            deleted = conn.execute(
+                "DELETE FROM ohlc_cache WHERE fetched_at < ?", (int(time.time()) - max_ttl,)
+            ).rowcount
+            conn.commit()
+    except sqlite3.Error as e:
+        logger.warning(f"OHLC cache prune failed: {e}")
+        return
+    if deleted:
+        logger.info(f"Pruned {deleted} expired OHLC cache entries")
+
 class ProbabilityAnalyzer:
     """Probability Analyzer für Candlestick Patterns"""
 
     def __init__(self):
         self.data = None
+        self.codes = None
+        self.date_strings = None
+        self.pattern_index = {}
+        self.counts = None
         self.symbol = None
         self.timeframe = None
 
+    def set_data(self, data: pd.DataFrame, symbol: str, timeframe: str):
+        """Attach OHLC data (with Candle_Type column) and encode candle types as int8"""
+        candle_types = data['Candle_Type']
+        if not (isinstance(candle_types.dtype, pd.CategoricalDtype) and list(candle_types.cat.categories) == CANDLE_TYPES):
+            # Intern string labels as a Categorical so the frame holds int8 codes instead of
+            # Python objects; anything that is not Bullish/Bearish counts as Doji
+            candle_types = candle_types.astype(pd.CategoricalDtype(CANDLE_TYPES)).fillna('Doji')
+            data['Candle_Type'] = candle_types
+        # Reuse the categorical codes without copying
+        self.codes = candle_types.cat.codes.to_numpy()
+        self.data = data
+        self.date_strings = None  # formatted lazily, only pattern_details needs them
+        self.pattern_index = {}
+        self.counts = None
+        self.symbol = symbol
+        self.timeframe = timeframe
+
+    def candle_counts(self) -> Dict[str, int]:
+        """Count bullish/bearish/doji candles in a single pass over the int8 codes (cached until set_data)"""
+        if self.counts is None:
+            counts = np.bincount(self.codes, minlength=len(CANDLE_CODES))
+            self.counts = {
+                'bullish': int(counts[CANDLE_CODES['Bullish']]),
+                'bearish': int(counts[CANDLE_CODES['Bearish']]),
+                'doji': int(counts[CANDLE_CODES['Doji']])
+            }
+        return dict(self.counts)
+
     def _try_alternative_source(self, symbol: str, timeframe: str, period: str) -> pd.DataFrame:
         """Try alternative data sources as fallback"""
         try:
-            import requests
-
             # Try different free APIs (pass original symbol, each method handles conversion)
-            sources = [
+            unmetered_sources = [
                 self._try_yahoo_csv,  # Direct CSV download (best fallback)
                 self._try_yahoo_finance_v8,  # Yahoo v8 API endpoint
                 self._try_investing_com,  # Symbol variations
+            ]
+            # Free tiers allow only 5-8 requests per minute: never call these speculatively
+            metered_sources = [
                 self._try_twelvedata,  # Good for forex and indices (needs API key)
                 self._try_alphavantage,  # Free tier with API key
             ]
+            unmetered_sources = [source_func for source_func in unmetered_sources
+                                 if not _SOURCE_BREAKER.is_open(f"{source_func.__name__}:{symbol}")]
+            metered_sources = [source_func for source_func in metered_sources
+                               if not _SOURCE_BREAKER.is_open(f"{source_func.__name__}:{symbol}")]
+            if not unmetered_sources and not metered_sources:
+                logger.warning("All alternative sources have open circuits")
+                return pd.DataFrame()
 
-            for source_func in sources:
+            # Query the unmetered sources concurrently and take the first non-empty result,
+            # instead of waiting for each one to time out in turn
+            if unmetered_sources:
+                executor = ThreadPoolExecutor(max_workers=len(unmetered_sources))
                 try:
-                    logger.info(f"Trying alternative source: {source_func.__name__}")
-                    data = source_func(symbol, timeframe, period)
-                    if not data.empty:
-                        logger.info(f"✓ SUCCESS with {source_func.__name__}")
-                        return data
-                except Exception as e:
-                    logger.error(f"Alternative source {source_func.__name__} failed: {e}")
-                    continue
+                    futures = {}
+                    for source_func in unmetered_sources:
+                        logger.info(f"Trying alternative source: {source_func.__name__}")
+                        futures[executor.submit(source_func, symbol, timeframe, period)] = source_func
+
+                    for future in as_completed(futures):
+                        data = self._alternative_result(futures[future], future.result, symbol)
+                        if not data.empty:
+                            return data
+                finally:
+                    # Don't wait for slower sources once we have an answer
+                    executor.shutdown(wait=False, cancel_futures=True)
+
+            # Metered sources one after another, so a hit spends exactly one quota request
+            for source_func in metered_sources:
+                logger.info(f"Trying alternative source: {source_func.__name__}")
+                data = self._alternative_result(
+                    source_func, lambda: source_func(symbol, timeframe, period), symbol
+                )
+                if not data.empty:
+                    return data
 
             return pd.DataFrame()
 
@@ -249,16 +572,28 @@ class ProbabilityAnalyzer:
             logger.error(f"All alternative sources failed: {e}")
             return pd.DataFrame()
 
+    def _alternative_result(self, source_func, fetch, symbol: str) -> pd.DataFrame:
+        """Run fetch() for one alternative source and record the outcome on its circuit"""
+        breaker_key = f"{source_func.__name__}:{symbol}"
+        try:
+            data = fetch()
+        except Exception as e:
+            logger.error(f"Alternative source {source_func.__name__} failed: {e}")
+            _SOURCE_BREAKER.record_failure(breaker_key)
+            return pd.DataFrame()
+        if data.empty:
+            _SOURCE_BREAKER.record_failure(breaker_key)
+        else:
+            logger.info(f"✓ SUCCESS with {source_func.__name__}")
+            _SOURCE_BREAKER.record_success(breaker_key)
+        return data
+
     def _try_yahoo_finance_v8(self, symbol: str, timeframe: str, period: str) -> pd.DataFrame:
         """Try Yahoo Finance v8 API endpoint (sometimes works when others fail)"""
-        import requests
-        from datetime import datetime, timedelta
-
         try:
             # Calculate dates
             end_date = datetime.now()
-            period_map = {'1y': 365, '2y': 730, '5y': 1825, '10y': 3650}
-            days = period_map.get(period, 1825)
+            days = PERIOD_DAYS.get(period, 1825)
             start_date = end_date - timedelta(days=days)
 
             # Convert to Unix timestamps
@@ -266,8 +601,7 @@ class ProbabilityAnalyzer:
             end_ts = int(end_date.timestamp())
 
             # Map timeframe
-            interval_map = {'1d': '1d', '1wk': '1wk', '1mo': '1mo'}
-            interval = interval_map.get(timeframe, '1d')
+            interval = YAHOO_INTERVALS.get(timeframe, '1d')
 
             # v8 chart API endpoint
             url = f"https://query2.finance.yahoo.com/v8/finance/chart/{symbol}"
@@ -285,10 +619,10 @@ class ProbabilityAnalyzer:
             }
 
             logger.info(f"Yahoo v8 API: Trying {symbol}")
-            response = requests.get(url, params=params, headers=headers, timeout=10)
+            response = _HTTP.get(url, params=params, headers=headers, timeout=10)
 
             if response.status_code == 200:
-                json_data = response.json()
+                json_data = orjson.loads(response.content)
 
                 if 'chart' in json_data and 'result' in json_data['chart']:
                     result = json_data['chart']['result'][0]
@@ -320,8 +654,6 @@ class ProbabilityAnalyzer:
 
     def _try_investing_com(self, symbol: str, timeframe: str, period: str) -> pd.DataFrame:
         """Try alternate symbol variations as last resort"""
-        import requests
-
         try:
             # Try common symbol variations for Yahoo Finance
             variations = []
@@ -360,14 +692,11 @@ class ProbabilityAnalyzer:
 
     def _try_twelvedata(self, symbol: str, timeframe: str, period: str) -> pd.DataFrame:
         """Try Twelve Data free tier (no API key needed for some endpoints)"""
-        import requests
-
         # Twelve Data free endpoint
         url = f"https://api.twelvedata.com/time_series"
 
         # Map timeframe
-        interval_map = {'1d': '1day', '1wk': '1week', '1mo': '1month'}
-        interval = interval_map.get(timeframe, '1day')
+        interval = TWELVEDATA_INTERVALS.get(timeframe, '1day')
 
         # Convert symbol format for Twelve Data using our conversion function
         api_symbol = convert_symbol_for_source(symbol, "twelvedata")
@@ -381,11 +710,11 @@ class ProbabilityAnalyzer:
         }
 
         logger.info(f"Twelve Data request: {url} with params: {params}")
-        response = requests.get(url, params=params, timeout=10)
+        response = _HTTP.get(url, params=params, timeout=10)
         logger.info(f"Twelve Data response status: {response.status_code}")
 
         if response.status_code == 200:
-            json_data = response.json()
+            json_data = orjson.loads(response.content)
             logger.info(f"Twelve Data JSON keys: {json_data.keys()}")
 
             if 'values' in json_data:
@@ -406,8 +735,7 @@ class ProbabilityAnalyzer:
                 }, inplace=True)
 
                 # Convert to numeric
-                for col in ['Open', 'High', 'Low', 'Close']:
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
+                df[OHLC_COLUMNS] = df[OHLC_COLUMNS].apply(pd.to_numeric, errors='coerce')
 
                 df.dropna(inplace=True)
                 return df
@@ -419,14 +747,9 @@ class ProbabilityAnalyzer:
     def _try_yahoo_csv(self, symbol: str, timeframe: str, period: str) -> pd.DataFrame:
         """Try Yahoo Finance CSV endpoint directly (bypasses some blocks)"""
         try:
-            import requests
-            from datetime import datetime, timedelta
-            import time
-
             # Calculate dates
             end_date = datetime.now()
-            period_map = {'1y': 365, '2y': 730, '5y': 1825, '10y': 3650}
-            days = period_map.get(period, 1825)
+            days = PERIOD_DAYS.get(period, 1825)
             start_date = end_date - timedelta(days=days)
 
             # Convert to Unix timestamps
@@ -434,8 +757,7 @@ class ProbabilityAnalyzer:
             end_ts = int(end_date.timestamp())
 
             # Map timeframe to Yahoo interval
-            interval_map = {'1d': '1d', '1wk': '1wk', '1mo': '1mo'}
-            interval = interval_map.get(timeframe, '1d')
+            interval = YAHOO_INTERVALS.get(timeframe, '1d')
 
             # Yahoo Finance CSV download URL
             url = f"https://query1.finance.yahoo.com/v7/finance/download/{symbol}"
@@ -458,17 +780,20 @@ class ProbabilityAnalyzer:
 
             logger.info(f"Yahoo CSV direct: Trying {symbol} via CSV endpoint")
 
-            response = requests.get(url, params=params, headers=headers, timeout=10)
+            response = _HTTP.get(url, params=params, headers=headers, timeout=10)
 
-            if response.status_code == 200 and len(response.text) > 100:
-                # Parse CSV
-                from io import StringIO
-                csv_data = StringIO(response.text)
-                data = pd.read_csv(csv_data)
+            if response.status_code == 200 and len(response.content) > 100:
+                # Parse the raw bytes with the C engine, dropping unused columns
+                # (Adj Close) and parsing dates straight into the index
+                data = pd.read_csv(
+                    io.BytesIO(response.content),
+                    engine='c',
+                    usecols=lambda col: col in YAHOO_CSV_COLUMNS,
+                    index_col='Date',
+                    parse_dates=['Date']
+                )
 
-                if not data.empty and 'Date' in data.columns:
-                    data['Date'] = pd.to_datetime(data['Date'])
-                    data.set_index('Date', inplace=True)
+                if not data.empty:
                     data.sort_index(inplace=True)
 
                     # Ensure required columns exist
@@ -479,7 +804,7 @@ class ProbabilityAnalyzer:
                     else:
                         logger.warning(f"Yahoo CSV: Missing columns. Found: {data.columns.tolist()}")
             else:
-                logger.warning(f"Yahoo CSV direct: HTTP {response.status_code}, content length: {len(response.text)}")
+                logger.warning(f"Yahoo CSV direct: HTTP {response.status_code}, content length: {len(response.content)}")
 
             return pd.DataFrame()
 
@@ -489,8 +814,6 @@ class ProbabilityAnalyzer:
 
     def _try_alphavantage(self, symbol: str, timeframe: str, period: str) -> pd.DataFrame:
         """Try Alpha Vantage (free tier: 25 requests/day, no credit card needed)"""
-        import requests
-
         try:
             # Get API key from environment or use demo key
             api_key = os.environ.get("ALPHAVANTAGE_API_KEY", "demo")
@@ -499,18 +822,13 @@ class ProbabilityAnalyzer:
             api_symbol = convert_symbol_for_source(symbol, "alphavantage")
 
             # Map function based on timeframe
-            function_map = {
-                '1d': 'TIME_SERIES_DAILY',
-                '1wk': 'TIME_SERIES_WEEKLY',
-                '1mo': 'TIME_SERIES_MONTHLY'
-            }
-            function = function_map.get(timeframe, 'TIME_SERIES_DAILY')
+            function = ALPHAVANTAGE_FUNCTIONS.get(timeframe, 'TIME_SERIES_DAILY')
 
             # For Forex pairs - detect if it's a 6-char forex symbol (EURUSD, GBPUSD, etc.)
             if len(api_symbol) == 6 and symbol.endswith('=X'):  # EURUSD
                 from_currency = api_symbol[:3]
                 to_currency = api_symbol[3:]
-                function = 'FX_DAILY' if timeframe == '1d' else 'FX_WEEKLY' if timeframe == '1wk' else 'FX_MONTHLY'
+                function = ALPHAVANTAGE_FX_FUNCTIONS.get(timeframe, 'FX_MONTHLY')
 
                 url = "https://www.alphavantage.co/query"
                 params = {
@@ -531,10 +849,10 @@ class ProbabilityAnalyzer:
                 }
 
             logger.info(f"Alpha Vantage: Trying {api_symbol} with function {function}")
-            response = requests.get(url, params=params, timeout=15)
+            response = _HTTP.get(url, params=params, timeout=15)
 
             if response.status_code == 200:
-                json_data = response.json()
+                json_data = orjson.loads(response.content)
 
                 # Find the time series key
                 ts_key = None
@@ -560,9 +878,8 @@ class ProbabilityAnalyzer:
                     df = df.sort_index()
 
                     # Convert to numeric
-                    for col in ['Open', 'High', 'Low', 'Close']:
-                        if col in df.columns:
-                            df[col] = pd.to_numeric(df[col], errors='coerce')
+                    ohlc = [col for col in OHLC_COLUMNS if col in df.columns]
+                    df[ohlc] = df[ohlc].apply(pd.to_numeric, errors='coerce')
 
                     df.dropna(inplace=True)
 
@@ -579,165 +896,198 @@ class ProbabilityAnalyzer:
             return pd.DataFrame()
 
     def load_data(self, symbol: str, timeframe: str, period: str = "5y") -> pd.DataFrame:
-        """Load historical OHLC data from yfinance"""
+        """Load historical OHLC data (SQLite cache first, then yfinance)"""
         try:
             logger.info(f"Loading data for {symbol} with timeframe {timeframe}")
 
-            # Enhanced headers to avoid Yahoo Finance blocking (Railway fix)
-            import requests
-            import random
+            # Round to appropriate decimal places
+            decimal_places = 5 if any(fx in symbol for fx in ['=X', 'USD', 'EUR', 'GBP', 'JPY']) else 2
 
-            # Rotate User-Agents for better success rate
-            user_agents = [
-                'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
-                'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
-                'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
-                'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:122.0) Gecko/20100101 Firefox/122.0'
-            ]
+            # The cache stores the prepared frame, so hits skip rounding and classification
+            data = read_ohlc_cache(symbol, timeframe, period)
+            if data is None:
+                data = add_candle_columns(self._download_ohlc(symbol, timeframe, period), decimal_places)
+                write_ohlc_cache(symbol, timeframe, period, data)
+            else:
+                logger.info(f"✓ Cache hit for {symbol} ({timeframe}, {period}): {len(data)} rows")
+                if 'Candle_Type' not in data.columns:  # entry written before candles were cached
+                    add_candle_columns(data, decimal_places)
 
-            session = requests.Session()
-            session.headers.update({
-                'User-Agent': random.choice(user_agents),
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.9',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1',
-                'Sec-Fetch-Dest': 'document',
-                'Sec-Fetch-Mode': 'navigate',
-                'Sec-Fetch-Site': 'none',
-                'Cache-Control': 'max-age=0',
-                'DNT': '1'
-            })
-            logger.info("Using enhanced headers for Railway compatibility")
-
-            # Try different symbol variations if available
-            symbols_to_try = SYMBOL_ALIASES.get(symbol, [symbol])
-            data = pd.DataFrame()
-
-            # Retry configuration
-            max_retries = 3
-            retry_delay = 2  # seconds
-
-            for try_symbol in symbols_to_try:
-                logger.info(f"Attempting to load: {try_symbol}")
-
-                for retry in range(max_retries):
-                    try:
-                        if retry > 0:
-                            import time
-                            logger.info(f"Retry {retry}/{max_retries} after {retry_delay}s delay")
-                            time.sleep(retry_delay)
-
-                        # Set timeout for requests
-                        session.request = lambda *args, **kwargs: requests.Session.request(
-                            session, *args, **{**kwargs, 'timeout': 10}
-                        )
-
-                        ticker = yf.Ticker(try_symbol, session=session)
-
-                        # Method 1: With auto_adjust
-                        logger.info(f"Method 1: period={period}, interval={timeframe}, auto_adjust=True")
-                        data = ticker.history(
-                            period=period,
-                            interval=timeframe,
-                            auto_adjust=True,
-                            prepost=False,
-                            actions=False,
-                            timeout=10
-                        )
-                        logger.info(f"Method 1 result: {len(data)} rows, empty={data.empty}")
+            self.set_data(data, symbol, timeframe)
 
-                        if not data.empty:
-                            logger.info(f"✓ SUCCESS with {try_symbol} (Method 1)")
-                            logger.info(f"Date range: {data.index[0]} to {data.index[-1]}")
-                            break
-
-                        # Method 2: Without auto_adjust
-                        logger.info(f"Method 2: Trying without auto_adjust")
-                        data = ticker.history(
-                            period=period,
-                            interval=timeframe,
-                            auto_adjust=False,
-                            prepost=False,
-                            timeout=10
-                        )
-                        logger.info(f"Method 2 result: {len(data)} rows, empty={data.empty}")
+            logger.info(f"Successfully loaded {len(data)} candles")
+            return data
 
-                        if not data.empty:
-                            logger.info(f"✓ SUCCESS with {try_symbol} (Method 2)")
-                            logger.info(f"Date range: {data.index[0]} to {data.index[-1]}")
-                            break
+        except Exception as e:
+            logger.error(f"Error loading data: {str(e)}")
+            raise
 
-                    except Exception as e:
-                        logger.error(f"✗ Exception for {try_symbol} (attempt {retry + 1}/{max_retries}): {str(e)}")
-                        if retry == max_retries - 1:
-                            continue
+    def _download_ohlc(self, symbol: str, timeframe: str, period: str) -> pd.DataFrame:
+        """Download raw OHLC data from yfinance, falling back to alternative sources"""
+        # Enhanced headers to avoid Yahoo Finance blocking (Railway fix)
+        # Rotate User-Agents for better success rate
+        session = requests.Session()
+        session.headers.update({
+            'User-Agent': random.choice(USER_AGENTS),
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.9',
+            'Accept-Encoding': 'gzip, deflate, br',
+            'Connection': 'keep-alive',
+            'Upgrade-Insecure-Requests': '1',
+            'Sec-Fetch-Dest': 'document',
+            'Sec-Fetch-Mode': 'navigate',
+            'Sec-Fetch-Site': 'none',
+            'Cache-Control': 'max-age=0',
+            'DNT': '1'
+        })
+        logger.info("Using enhanced headers for Railway compatibility")
 
-                if not data.empty:
-                    break
+        # Try different symbol variations if available
+        symbols_to_try = SYMBOL_ALIASES.get(symbol, [symbol])
+        data = pd.DataFrame()
 
-            if data.empty:
-                # Fallback: Try alternative data source (Alpha Vantage Free API)
-                logger.warning(f"Yahoo Finance failed for {symbol}. Trying alternative source...")
-                data = self._try_alternative_source(symbol, timeframe, period)
+        # Retry configuration
+        max_retries = 3
+        yfinance_error = False  # only exceptions count against the yfinance circuit, not empty results
 
-                if data.empty:
-                    error_msg = f"No data for {symbol}. Tried: {', '.join(symbols_to_try)} + alternative sources"
-                    logger.error(f"✗ FAILED: {error_msg}")
-                    raise ValueError(error_msg)
+        # Skip yfinance entirely while its circuit is open
+        yfinance_symbols = [] if _SOURCE_BREAKER.is_open('yfinance') else symbols_to_try
+        if not yfinance_symbols:
+            logger.warning("yfinance circuit open - going straight to alternative sources")
 
-            # Round to appropriate decimal places
-            decimal_places = 5 if any(fx in symbol for fx in ['=X', 'USD', 'EUR', 'GBP', 'JPY']) else 2
+        for try_symbol in yfinance_symbols:
+            logger.info(f"Attempting to load: {try_symbol}")
 
-            data['Open'] = data['Open'].round(decimal_places)
-            data['High'] = data['High'].round(decimal_places)
-            data['Low'] = data['Low'].round(decimal_places)
-            data['Close'] = data['Close'].round(decimal_places)
+            for retry in range(max_retries):
+                try:
+                    if retry > 0:
+                        # Exponential backoff with jitter so retries don't hit Yahoo in lockstep
+                        retry_delay = min(30, 2 ** retry) + random.random()
+                        logger.info(f"Retry {retry}/{max_retries} after {retry_delay:.1f}s delay")
+                        time.sleep(retry_delay)
+
+                    # Set timeout for requests
+                    session.request = lambda *args, **kwargs: requests.Session.request(
+                        session, *args, **{**kwargs, 'timeout': 10}
+                    )
+
+                    ticker = _yfinance().Ticker(try_symbol, session=session)
+
+                    # Method 1: With auto_adjust
+                    logger.info(f"Method 1: period={period}, interval={timeframe}, auto_adjust=True")
+                    data = ticker.history(
+                        period=period,
+                        interval=timeframe,
+                        auto_adjust=True,
+                        prepost=False,
+                        actions=False,
+                        timeout=10
+                    )
+                    logger.info(f"Method 1 result: {len(data)} rows, empty={data.empty}")
 
-            # Calculate price change and candle type
-            data['Price_Change'] = (data['Close'] - data['Open']).round(decimal_places)
-            data['Candle_Type'] = np.where(
-                data['Price_Change'] > 0, 'Bullish',
-                np.where(data['Price_Change'] < 0, 'Bearish', 'Doji')
-            )
+                    if not data.empty:
+                        logger.info(f"✓ SUCCESS with {try_symbol} (Method 1)")
+                        logger.info(f"Date range: {data.index[0]} to {data.index[-1]}")
+                        break
 
-            self.data = data
-            self.symbol = symbol
-            self.timeframe = timeframe
+                    # Method 2: Without auto_adjust
+                    logger.info(f"Method 2: Trying without auto_adjust")
+                    data = ticker.history(
+                        period=period,
+                        interval=timeframe,
+                        auto_adjust=False,
+                        prepost=False,
+                        actions=False,
+                        timeout=10
+                    )
+                    logger.info(f"Method 2 result: {len(data)} rows, empty={data.empty}")
 
-            logger.info(f"Successfully loaded {len(data)} candles")
-            return data
+                    if not data.empty:
+                        logger.info(f"✓ SUCCESS with {try_symbol} (Method 2)")
+                        logger.info(f"Date range: {data.index[0]} to {data.index[-1]}")
+                        break
 
-        except Exception as e:
-            logger.error(f"Error loading data: {str(e)}")
-            raise
+                except Exception as e:
+                    yfinance_error = True
+                    logger.error(f"✗ Exception for {try_symbol} (attempt {retry + 1}/{max_retries}): {str(e)}")
+                    if retry == max_retries - 1:
+                        continue
+
+            if not data.empty:
+                break
+
+        if yfinance_symbols:
+            if not data.empty:
+                _SOURCE_BREAKER.record_success('yfinance')
+            elif yfinance_error:
+                _SOURCE_BREAKER.record_failure('yfinance')
+
+        if data.empty:
+            # Fallback: Try alternative data source (Alpha Vantage Free API)
+            logger.warning(f"Yahoo Finance failed for {symbol}. Trying alternative source...")
+            data = self._try_alternative_source(symbol, timeframe, period)
+
+            if data.empty:
+                error_msg = f"No data for {symbol}. Tried: {', '.join(symbols_to_try)} + alternative sources"
+                logger.error(f"✗ FAILED: {error_msg}")
+                raise ValueError(error_msg)
+
+        return data
 
     def find_patterns(self, pattern: List[str]) -> List[int]:
         """Find all occurrences of the specified pattern"""
-        if self.data is None or len(self.data) < len(pattern) + 1:
-            return []
+        return self._match_indices(pattern).tolist()
+
+    def _match_indices(self, pattern: List[str]) -> np.ndarray:
+        """End indices of all pattern occurrences as an int64 array"""
+        if self.codes is None or len(self.codes) < len(pattern) + 1:
+            return np.empty(0, np.int64)
 
-        matches = []
-        pattern_length = len(pattern)
+        pattern_codes = _encode_pattern(tuple(pattern))
+        pattern_length = pattern_codes.size
 
-        for i in range(len(self.data) - pattern_length):
-            match = True
-            for j in range(pattern_length):
-                if self.data.iloc[i + j]['Candle_Type'] != pattern[j]:
-                    match = False
-                    break
+        # Empty patterns or unknown candle names can never match - skip the scan entirely
+        if pattern_length == 0 or (pattern_codes < 0).any():
+            return np.empty(0, np.int64)
 
-            if match:
-                matches.append(i + pattern_length - 1)
+        if pattern_length <= PATTERN_INDEX_MAX_LENGTH:
+            return self._indexed_matches(pattern_codes)
+
+        if NUMBA_AVAILABLE:
+            # Compiled scan: no O(N x L) temporary, early exit on first mismatch
+            matches = _scan_pattern(self.codes, pattern_codes)
+        else:
+            # Compare every window at once; the last candle is excluded so each match has a successor
+            windows = np.lib.stride_tricks.sliding_window_view(self.codes[:-1], pattern_length)
+            matches = np.flatnonzero((windows == pattern_codes).all(axis=1)) + pattern_length - 1
 
         return matches
 
-    def calculate_probabilities(self, pattern: List[str]) -> Dict:
+    def _indexed_matches(self, pattern_codes: np.ndarray) -> np.ndarray:
+        """Look up a short pattern in the per-length window index (built on first use)"""
+        pattern_length = pattern_codes.size
+        powers = CANDLE_KEY_BASE ** np.arange(pattern_length, dtype=np.int64)
+
+        index = self.pattern_index.get(pattern_length)
+        if index is None:
+            # Key every window once; a stable sort keeps matches for a key in ascending order
+            windows = np.lib.stride_tricks.sliding_window_view(self.codes[:-1], pattern_length)
+            keys = windows.astype(np.int64) @ powers
+            order = np.argsort(keys, kind='stable')
+            index = (keys[order], order)
+            self.pattern_index[pattern_length] = index
+
+        sorted_keys, order = index
+        key = int(pattern_codes.astype(np.int64) @ powers)
+        lo, hi = np.searchsorted(sorted_keys, [key, key + 1])
+        return order[lo:hi] + pattern_length - 1
+
+    def calculate_probabilities(self, pattern: List[str], include_details: bool = False) -> Dict:
         """Calculate probabilities for next candle after pattern"""
-        matches = self.find_patterns(pattern)
+        # Stays a NumPy array end to end - no list round-trip between search and counting
+        matches = self._match_indices(pattern)
 
-        if not matches:
+        if matches.size == 0:
             return {
                 'total_matches': 0,
                 'next_bullish': 0,
@@ -747,34 +1097,27 @@ class ProbabilityAnalyzer:
                 'pattern_details': []
             }
 
-        next_bullish = 0
-        next_bearish = 0
-        valid_matches = []
-        pattern_details = []
-
-        for match_idx in matches:
-            if match_idx + 1 < len(self.data):
-                next_candle_type = self.data.iloc[match_idx + 1]['Candle_Type']
-                valid_matches.append(match_idx)
-
-                pattern_start = match_idx - len(pattern) + 1
-                pattern_dates = [
-                    self.data.index[pattern_start + i].strftime('%Y-%m-%d')
-                    for i in range(len(pattern))
-                ]
-
-                pattern_details.append({
-                    'pattern_dates': pattern_dates,
-                    'next_date': self.data.index[match_idx + 1].strftime('%Y-%m-%d'),
-                    'next_candle': next_candle_type
-                })
-
-                if next_candle_type == 'Bullish':
-                    next_bullish += 1
-                else:
-                    next_bearish += 1
+        # find_patterns excludes the last candle, so every match has a successor
+        next_codes = self.codes[matches + 1]
+        total_valid = int(matches.size)
+        next_bullish = int(np.count_nonzero(next_codes == CANDLE_CODES['Bullish']))
+        next_bearish = total_valid - next_bullish  # Doji successors count as bearish
 
-        total_valid = len(valid_matches)
+        # Per-match dates are only built when the caller asks for them
+        pattern_details = []
+        if include_details:
+            if self.date_strings is None:
+                self.date_strings = self.data.index.strftime('%Y-%m-%d').to_numpy()
+            dates = self.date_strings
+            pattern_length = len(pattern)
+            pattern_details = [
+                {
+                    'pattern_dates': dates[match_idx - pattern_length + 1:match_idx + 1].tolist(),
+                    'next_date': dates[match_idx + 1],
+                    'next_candle': CANDLE_TYPES[next_code]
+                }
+                for match_idx, next_code in zip(matches.tolist(), next_codes.tolist())
+            ]
 
         return {
             'total_matches': total_valid,
@@ -785,9 +1128,119 @@ class ProbabilityAnalyzer:
             'pattern_details': pattern_details
         }
 
+# Yahoo serves at most this many tickers per batched download
+YF_BATCH_LIMIT = 20
+
+def load_data_batch(symbols: List[str], timeframe: str = "1d", period: str = "1mo") -> Dict[str, pd.DataFrame]:
+    """Download OHLC history for several symbols in one yfinance call, split per symbol"""
+    symbols = list(dict.fromkeys(symbols))[:YF_BATCH_LIMIT]
+    if not symbols:
+        return {}
+
+    raw = _yfinance().download(
+        symbols,
+        period=period,
+        interval=timeframe,
+        group_by='ticker',
+        auto_adjust=True,
+        actions=False,
+        progress=False,
+        threads=True
+    )
+    if raw.empty:
+        return {}
+    if not isinstance(raw.columns, pd.MultiIndex):
+        return {symbols[0]: raw}
+
+    frames = {}
+    for symbol in symbols:
+        if symbol not in raw.columns.get_level_values(0):
+            continue
+        # Symbols trade on different calendars; drop the rows that only exist for the others
+        frame = raw[symbol].dropna(how='all')
+        if not frame.empty:
+            frames[symbol] = frame
+    return frames
+
+# Loaded analyzers keyed by (symbol, timeframe, period). Analyzers are read-only once
+# built, so concurrent requests can share them safely.
+ANALYZER_CACHE_TTL = 300  # seconds
+_ANALYZER_CACHE = TTLCache(maxsize=64, ttl=ANALYZER_CACHE_TTL)
+# cachetools caches are not thread-safe; get_cached_analyzer runs in worker threads
+_ANALYZER_CACHE_LOCK = threading.Lock()
+
+# Admission filter: a key is cached on its second miss, or on a first miss whenever the
+# accumulator crosses 1 (deterministic "probability" ANALYZER_ADMIT_PROBABILITY). One-off
+# symbols therefore rarely evict hot ones; a re-miss is cheap thanks to the SQLite OHLC cache.
+ANALYZER_ADMIT_PROBABILITY = 0.3
+_ANALYZER_SEEN = TTLCache(maxsize=1024, ttl=4 * ANALYZER_CACHE_TTL)
+_ANALYZER_ADMISSION = {"acc": 0.0}
+
+def _admit_analyzer(key: Tuple[str, str, str]) -> bool:
+    """Decide whether a freshly loaded analyzer goes into _ANALYZER_CACHE (caller holds _ANALYZER_CACHE_LOCK)"""
+    if key in _ANALYZER_SEEN:
+        return True
+    _ANALYZER_SEEN[key] = True
+    _ANALYZER_ADMISSION["acc"] += ANALYZER_ADMIT_PROBABILITY
+    if _ANALYZER_ADMISSION["acc"] >= 1:
+        _ANALYZER_ADMISSION["acc"] -= 1
+        return True
+    return False
+
+def get_cached_analyzer(symbol: str, timeframe: str, period: str) -> ProbabilityAnalyzer:
+    """Return a loaded analyzer, downloading data only on cache miss"""
+    key = (symbol, timeframe, period)
+    with _ANALYZER_CACHE_LOCK:
+        analyzer = _ANALYZER_CACHE.get(key)
+    if analyzer is None:
+        # Load outside the lock; concurrent misses for the same key may both download
+        analyzer = ProbabilityAnalyzer()
+        analyzer.load_data(symbol=symbol, timeframe=timeframe, period=period)
+        with _ANALYZER_CACHE_LOCK:
+            if _admit_analyzer(key):
+                _ANALYZER_CACHE[key] = analyzer
+    return analyzer
+
 # Initialize authentication database
 init_database()
 
+async def _flush_last_logins_periodically():
+    """Batch-write queued last_login updates every few seconds, prune the OHLC cache hourly"""
+    last_prune = 0.0
+    while True:
+        await asyncio.sleep(LAST_LOGIN_FLUSH_INTERVAL)
+        try:
+            # Blocks on the single write connection - keep it off the event loop
+            await asyncio.to_thread(flush_last_logins)
+        except Exception as e:
+            logger.warning(f"Flushing last_login updates failed: {e}")
+
+        if time.monotonic() - last_prune >= OHLC_CACHE_PRUNE_INTERVAL:
+            last_prune = time.monotonic()
+            await asyncio.to_thread(prune_ohlc_cache)
+
+@app.on_event("startup")
+async def startup_event():
+    """Open the SQLite connection pool, start background tasks and compile the pattern kernel"""
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    init_pool()
+    load_html_pages()
+    app.state.yf_pool = _new_yf_pool()
+    await asyncio.to_thread(warm_up_pattern_scan)
+    await asyncio.to_thread(warm_up_risk_kernel)
+    app.state.last_login_task = asyncio.create_task(_flush_last_logins_periodically())
+    app.state.news_refresh_task = asyncio.create_task(_refresh_news_periodically())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background tasks, flush pending updates and close pooled SQLite connections"""
+    app.state.last_login_task.cancel()
+    app.state.news_refresh_task.cancel()
+    flush_last_logins()
+    close_pool()
+    app.state.yf_pool.shutdown(wait=False, cancel_futures=True)
+    await _ASYNC_HTTP.aclose()
+
 # Auto-create admin user if none exists
 try:
     from auth import get_user, create_user, UserCreate
@@ -823,8 +1276,11 @@ except Exception as e:
 # AUTHENTICATION ENDPOINTS
 # ============================================
 
+# Handlers below that only do blocking SQLite (or bcrypt) work are plain `def`, so FastAPI
+# runs them in its threadpool instead of stalling the event loop
+
 @app.post("/api/auth/login", response_model=Token)
-async def login(user_login: UserLogin):
+def login(user_login: UserLogin):
     """Login endpoint - returns JWT token"""
     user = authenticate_user(user_login.username, user_login.password)
     if not user:
@@ -846,7 +1302,7 @@ async def read_users_me(current_user: User = Depends(get_current_active_user)):
     return current_user
 
 @app.post("/api/auth/register", response_model=User)
-async def register_user(
+def register_user(
     user_create: UserCreate,
     current_admin: User = Depends(get_current_admin_user)
 ):
@@ -859,13 +1315,13 @@ async def register_user(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error creating user: {str(e)}")
 
-@app.get("/api/admin/users", response_model=List[User])
-async def list_users(current_admin: User = Depends(get_current_admin_user)):
+@app.get("/api/admin/users", response_model=List[UserOverview])
+def list_users(current_admin: User = Depends(get_current_admin_user)):
     """List all users (admin only)"""
-    return get_all_users()
+    return ORJSONResponse([user.model_dump() for user in get_all_users()])
 
 @app.delete("/api/admin/users/{username}")
-async def remove_user(
+def remove_user(
     username: str,
     current_admin: User = Depends(get_current_admin_user)
 ):
@@ -884,79 +1340,68 @@ async def remove_user(
 # ============================================
 
 @app.get("/api/user/watchlist")
-async def get_user_watchlist(current_user: User = Depends(get_current_active_user)):
+def get_user_watchlist(current_user: User = Depends(get_current_active_user)):
     """Get user's watchlist"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT symbol, category, added_at
-        FROM watchlist
-        WHERE username = ?
-        ORDER BY added_at DESC
-    """, (current_user.username,))
-
-    watchlist = []
-    for row in cursor.fetchall():
-        watchlist.append({
-            "symbol": row[0],
-            "category": row[1],
-            "added_at": row[2]
-        })
+    # SQLite baut das JSON-Array selbst (JSON1) - keine Python-Objekte pro Zeile
+    with get_read_conn() as conn:
+        watchlist_json = conn.execute("""
+            SELECT json_group_array(json_object('symbol', symbol, 'category', category, 'added_at', added_at))
+            FROM (
+                SELECT symbol, category, added_at
+                FROM watchlist
+                WHERE username = ?
+                ORDER BY added_at DESC
+            )
+        """, (current_user.username,)).fetchone()[0]
 
-    conn.close()
-    return {"username": current_user.username, "watchlist": watchlist}
+    return ORJSONResponse({
+        "username": current_user.username,
+        "watchlist": orjson.Fragment(watchlist_json)
+    })
 
 @app.post("/api/user/watchlist")
-async def add_to_watchlist(
+def add_to_watchlist(
     symbol: str,
     category: str,
     current_user: User = Depends(get_current_active_user)
 ):
     """Add asset to watchlist"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-
-    try:
-        cursor.execute("""
-            INSERT INTO watchlist (username, symbol, category)
+    # Duplikate greift der Unique-Index (username, symbol) ab, ohne IntegrityError
+    with get_write_conn() as conn:
+        cursor = conn.execute("""
+            INSERT OR IGNORE INTO watchlist (username, symbol, category)
             VALUES (?, ?, ?)
         """, (current_user.username, symbol, category))
-
+        inserted = cursor.rowcount
         conn.commit()
-        return {"message": f"Added {symbol} to watchlist"}
-    except sqlite3.IntegrityError:
+
+    if inserted == 0:
         raise HTTPException(status_code=400, detail="Symbol already in watchlist")
-    finally:
-        conn.close()
+    return {"message": f"Added {symbol} to watchlist"}
 
 @app.delete("/api/user/watchlist/{symbol}")
-async def remove_from_watchlist(
+def remove_from_watchlist(
     symbol: str,
     current_user: User = Depends(get_current_active_user)
 ):
     """Remove asset from watchlist"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        DELETE FROM watchlist
-        WHERE username = ? AND symbol = ?
-    """, (current_user.username, symbol))
-
-    conn.commit()
-    conn.close()
+    with get_write_conn() as conn:
+        conn.execute("""
+            DELETE FROM watchlist
+            WHERE username = ? AND symbol = ?
+        """, (current_user.username, symbol))
+        conn.commit()
 
     return {"message": f"Removed {symbol} from watchlist"}
 
 @app.get("/api/user/settings")
-async def get_settings(current_user: User = Depends(get_current_active_user)):
+def get_settings(current_user: User = Depends(get_current_active_user)):
     """Get user settings"""
     settings = get_user_settings(current_user.username)
     return {"username": current_user.username, "settings": settings}
 
 @app.post("/api/user/settings")
-async def update_settings(
+def update_settings(
     settings: dict,
     current_user: User = Depends(get_current_active_user)
 ):
@@ -969,33 +1414,33 @@ async def update_settings(
 # ============================================
 
 @app.get("/api/user/widgets")
-async def get_user_widgets(current_user: User = Depends(get_current_active_user)):
+def get_user_widgets(current_user: User = Depends(get_current_active_user)):
     """Get user's dashboard widgets"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT id, widget_type, widget_config, position_x, position_y, width, height
-        FROM user_widgets
-        WHERE username = ?
-        ORDER BY id
-    """, (current_user.username,))
-
-    widgets = []
-    for row in cursor.fetchall():
-        config = json.loads(row[2]) if row[2] else {}
-        widgets.append({
-            "id": row[0],
-            "widget_type": row[1],
-            "widget_config": config,
-            "position_x": row[3],
-            "position_y": row[4],
-            "width": row[5],
-            "height": row[6]
-        })
+    with get_read_conn() as conn:
+        rows = conn.execute("""
+            SELECT id, widget_type, widget_config, position_x, position_y, width, height
+            FROM user_widgets
+            WHERE username = ?
+            ORDER BY id
+        """, (current_user.username,)).fetchall()
+
+    # widget_config is stored as JSON already; orjson.Fragment splices it into the
+    # response as-is instead of parsing and re-encoding every widget's config
+    widgets = [
+        {
+            "id": row["id"],
+            "widget_type": row["widget_type"],
+            "widget_config": orjson.Fragment(row["widget_config"]) if row["widget_config"] else {},
+            "position_x": row["position_x"],
+            "position_y": row["position_y"],
+            "width": row["width"],
+            "height": row["height"]
+        }
+        for row in rows
+    ]
 
-    conn.close()
-    return {"widgets": widgets}
+    # Returned as a response object so FastAPI's jsonable_encoder doesn't touch the fragments
+    return ORJSONResponse({"widgets": widgets})
 
 class WidgetCreate(BaseModel):
     widget_type: str
@@ -1006,31 +1451,28 @@ class WidgetCreate(BaseModel):
     height: int = 300
 
 @app.post("/api/user/widgets")
-async def add_widget(
+def add_widget(
     widget_data: WidgetCreate,
     current_user: User = Depends(get_current_active_user)
 ):
     """Add widget to user's dashboard"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-
     try:
-        cursor.execute("""
-            INSERT INTO user_widgets
-            (username, widget_type, widget_config, position_x, position_y, width, height)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
-            current_user.username,
-            widget_data.widget_type,
-            json.dumps(widget_data.widget_config),
-            widget_data.position_x,
-            widget_data.position_y,
-            widget_data.width,
-            widget_data.height
-        ))
-
-        widget_id = cursor.lastrowid
-        conn.commit()
+        with get_write_conn() as conn:
+            widget_id = conn.execute("""
+                INSERT INTO user_widgets
+                (username, widget_type, widget_config, position_x, position_y, width, height)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                RETURNING id
+            """, (
+                current_user.username,
+                widget_data.widget_type,
+                orjson.dumps(widget_data.widget_config).decode(),
+                widget_data.position_x,
+                widget_data.position_y,
+                widget_data.width,
+                widget_data.height
+            )).fetchone()[0]
+            conn.commit()
 
         logger.info(f"Widget created for {current_user.username}: ID={widget_id}, Type={widget_data.widget_type}")
 
@@ -1039,11 +1481,67 @@ async def add_widget(
     except Exception as e:
         logger.error(f"Error adding widget: {e}")
         raise HTTPException(status_code=500, detail=f"Error adding widget: {str(e)}")
-    finally:
-        conn.close()
+
+class WidgetCreateBulk(BaseModel):
+    widgets: List[WidgetCreate]
+
+@app.post("/api/user/widgets/bulk")
+def add_widgets_bulk(
+    widget_data: WidgetCreateBulk,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Add several widgets in one transaction (e.g. default dashboard layout)"""
+    if not widget_data.widgets:
+        raise HTTPException(status_code=400, detail="No widgets provided")
+
+    try:
+        with get_write_conn() as conn:
+            conn.executemany("""
+                INSERT INTO user_widgets
+                (username, widget_type, widget_config, position_x, position_y, width, height)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, [
+                (
+                    current_user.username,
+                    widget.widget_type,
+                    orjson.dumps(widget.widget_config).decode(),
+                    widget.position_x,
+                    widget.position_y,
+                    widget.width,
+                    widget.height
+                )
+                for widget in widget_data.widgets
+            ])
+
+            # BEGIN IMMEDIATE hält den Write-Lock, die IDs dieses Batches sind daher fortlaufend
+            last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            conn.commit()
+
+        count = len(widget_data.widgets)
+        widget_ids = list(range(last_id - count + 1, last_id + 1))
+        logger.info(f"{count} widgets created for {current_user.username}: IDs={widget_ids}")
+
+        return {"message": f"{count} widgets added successfully", "widget_ids": widget_ids}
+
+    except Exception as e:
+        logger.error(f"Error adding widgets: {e}")
+        raise HTTPException(status_code=500, detail=f"Error adding widgets: {str(e)}")
+
+# Fester SQL-Text für alle PUT-Varianten (statt 31 Spalten-Kombinationen) -> ein einziges
+# gecachtes Prepared Statement; NULL-Parameter lassen die jeweilige Spalte unverändert
+UPDATE_WIDGET_SQL = """
+    UPDATE user_widgets
+    SET widget_config = COALESCE(?, widget_config),
+        position_x = COALESCE(?, position_x),
+        position_y = COALESCE(?, position_y),
+        width = COALESCE(?, width),
+        height = COALESCE(?, height)
+    WHERE username = ? AND id = ?
+    RETURNING id
+"""
 
 @app.put("/api/user/widgets/{widget_id}")
-async def update_widget(
+def update_widget(
     widget_id: int,
     widget_config: Optional[dict] = None,
     position_x: Optional[int] = None,
@@ -1053,65 +1551,69 @@ async def update_widget(
     current_user: User = Depends(get_current_active_user)
 ):
     """Update widget configuration"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-
-    updates = []
-    params = []
-
-    if widget_config is not None:
-        updates.append("widget_config = ?")
-        params.append(json.dumps(widget_config))
-
-    if position_x is not None:
-        updates.append("position_x = ?")
-        params.append(position_x)
-
-    if position_y is not None:
-        updates.append("position_y = ?")
-        params.append(position_y)
-
-    if width is not None:
-        updates.append("width = ?")
-        params.append(width)
-
-    if height is not None:
-        updates.append("height = ?")
-        params.append(height)
-
-    if not updates:
+    if all(value is None for value in (widget_config, position_x, position_y, width, height)):
         raise HTTPException(status_code=400, detail="No updates provided")
 
-    params.extend([current_user.username, widget_id])
+    with get_write_conn() as conn:
+        updated = conn.execute(UPDATE_WIDGET_SQL, (
+            orjson.dumps(widget_config).decode() if widget_config is not None else None,
+            position_x, position_y, width, height,
+            current_user.username, widget_id,
+        )).fetchone()
+        conn.commit()
+
+    # RETURNING liefert nur bei Treffer eine Zeile -> 404 ohne extra SELECT
+    if updated is None:
+        raise HTTPException(status_code=404, detail="Widget not found")
+    return {"message": "Widget updated successfully"}
 
-    cursor.execute(f"""
-        UPDATE user_widgets
-        SET {', '.join(updates)}
-        WHERE username = ? AND id = ?
-    """, params)
+class WidgetLayout(BaseModel):
+    id: int
+    position_x: int
+    position_y: int
+    width: int
+    height: int
 
-    conn.commit()
-    conn.close()
+@app.post("/api/user/widgets/layout")
+def update_widget_layout(
+    layout: List[WidgetLayout],
+    current_user: User = Depends(get_current_active_user)
+):
+    """Move/resize several widgets at once (drag & drop rearrange)"""
+    if not layout:
+        raise HTTPException(status_code=400, detail="No widgets provided")
+
+    # Ein Commit (ein WAL-Sync) für den ganzen Drag-Vorgang statt einem pro Widget
+    with get_write_conn() as conn:
+        cursor = conn.executemany("""
+            UPDATE user_widgets
+            SET position_x = ?, position_y = ?, width = ?, height = ?
+            WHERE username = ? AND id = ?
+        """, [
+            (item.position_x, item.position_y, item.width, item.height, current_user.username, item.id)
+            for item in layout
+        ])
+        updated = cursor.rowcount
+        conn.commit()
 
-    return {"message": "Widget updated successfully"}
+    return {"message": "Layout updated successfully", "updated": updated}
 
 @app.delete("/api/user/widgets/{widget_id}")
-async def delete_widget(
+def delete_widget(
     widget_id: int,
     current_user: User = Depends(get_current_active_user)
 ):
     """Delete widget from dashboard"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        DELETE FROM user_widgets
-        WHERE username = ? AND id = ?
-    """, (current_user.username, widget_id))
-
-    conn.commit()
-    conn.close()
+    with get_write_conn() as conn:
+        deleted = conn.execute("""
+            DELETE FROM user_widgets
+            WHERE username = ? AND id = ?
+            RETURNING id
+        """, (current_user.username, widget_id)).fetchone()
+        conn.commit()
 
+    if deleted is None:
+        raise HTTPException(status_code=404, detail="Widget not found")
     return {"message": "Widget deleted successfully"}
 
 # ============================================
@@ -1135,33 +1637,82 @@ async def api_info():
         ]
     }
 
+def _accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """True if Accept-Encoding allows gzip - honours q-values, so "gzip;q=0" means no"""
+    if not accept_encoding:
+        return False
+    qvalues = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qvalues[coding.strip().lower()] = q
+    return qvalues.get('gzip', qvalues.get('*', 0.0)) > 0
+
+def _gzip_etag(etag: str) -> str:
+    """Strong validator for the gzipped variant - must differ from the identity body's ETag"""
+    return etag[:-1] + '-gz"'
+
+def _etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    """Weak comparison against an If-None-Match list, as RFC 9110 prescribes for GET"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    return any(tag.strip().removeprefix('W/') == etag for tag in if_none_match.split(','))
+
+def _precompressed_response(content: bytes, content_gz: bytes, accept_encoding: Optional[str],
+                            headers: Optional[Dict[str, str]] = None,
+                            media_type: str = "application/json") -> Response:
+    """Serve a body that was gzipped once up front; GZipMiddleware leaves encoded responses alone"""
+    headers = dict(headers or {}, Vary='Accept-Encoding')
+    if _accepts_gzip(accept_encoding):
+        headers['Content-Encoding'] = 'gzip'
+        content = content_gz
+    return Response(content=content, media_type=media_type, headers=headers)
+
+def _static_response(content: bytes, content_gz: bytes, etag: str,
+                     if_none_match: Optional[str], accept_encoding: Optional[str],
+                     media_type: str = "application/json",
+                     cache_control: str = STATIC_CACHE_CONTROL) -> Response:
+    """Serve a pre-built body, answering 304 when the client already has it"""
+    if _accepts_gzip(accept_encoding):
+        etag = _gzip_etag(etag)
+    headers = {'ETag': etag, 'Cache-Control': cache_control, 'Vary': 'Accept-Encoding'}
+    if _etag_matches(etag, if_none_match):
+        return Response(status_code=304, headers=headers)
+    return _precompressed_response(content, content_gz, accept_encoding, headers, media_type)
+
 @app.get("/api/assets")
-async def get_assets():
+async def get_assets(if_none_match: Optional[str] = Header(None),
+                     accept_encoding: Optional[str] = Header(None)):
     """Get all available assets"""
-    return ASSETS
+    return _static_response(ASSETS_JSON, ASSETS_JSON_GZ, ASSETS_ETAG, if_none_match, accept_encoding)
 
 @app.get("/api/timeframes")
-async def get_timeframes():
+async def get_timeframes(if_none_match: Optional[str] = Header(None),
+                         accept_encoding: Optional[str] = Header(None)):
     """Get available timeframes"""
-    return TIMEFRAMES
+    return _static_response(TIMEFRAMES_JSON, TIMEFRAMES_JSON_GZ, TIMEFRAMES_ETAG, if_none_match, accept_encoding)
 
 @app.post("/api/analyze")
 async def analyze_pattern(request: PatternRequest):
     """Analyze candlestick pattern probabilities"""
-    global analyzer_instance
-
     try:
         logger.info(f"Analyzing pattern {request.pattern} for {request.symbol}")
 
-        # Initialize analyzer
-        analyzer_instance = ProbabilityAnalyzer()
-
-        # Load data
-        data = analyzer_instance.load_data(
-            symbol=request.symbol,
-            timeframe=request.timeframe,
-            period=request.period
+        # Load data (reuses a recently loaded analyzer for the same symbol/timeframe/period).
+        # yfinance blocks, so run it in a worker thread to keep the event loop free
+        analyzer = await asyncio.to_thread(
+            get_cached_analyzer, request.symbol, request.timeframe, request.period
         )
+        data = analyzer.data
 
         if len(data) < 10:
             raise HTTPException(
@@ -1169,8 +1720,12 @@ async def analyze_pattern(request: PatternRequest):
                 detail="Nicht genügend historische Daten verfügbar"
             )
 
+        counts = analyzer.candle_counts()
+
         # Calculate probabilities
-        results = analyzer_instance.calculate_probabilities(request.pattern)
+        results = await asyncio.to_thread(
+            analyzer.calculate_probabilities, request.pattern, request.include_details
+        )
 
         # Prepare response
         response = {
@@ -1188,14 +1743,13 @@ async def analyze_pattern(request: PatternRequest):
                     'start': data.index[0].strftime('%Y-%m-%d'),
                     'end': data.index[-1].strftime('%Y-%m-%d')
                 },
-                'candle_types': {
-                    'bullish': int(sum(data['Candle_Type'] == 'Bullish')),
-                    'bearish': int(sum(data['Candle_Type'] == 'Bearish')),
-                    'doji': int(sum(data['Candle_Type'] == 'Doji'))
-                }
+                'candle_types': counts
             }
         }
 
+        if request.include_details:
+            response['pattern_details'] = results['pattern_details']
+
         logger.info(f"Analysis complete: {results['total_matches']} matches found")
         return response
 
@@ -1206,6 +1760,46 @@ async def analyze_pattern(request: PatternRequest):
         logger.error(f"Error in analysis: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Analyse fehlgeschlagen: {str(e)}")
 
+CSV_REQUIRED_COLUMNS = ['Date'] + OHLC_COLUMNS
+
+def parse_ohlc_csv(csv_file: IO[bytes]) -> pd.DataFrame:
+    """Parse an uploaded OHLC CSV (Date, Open, High, Low, Close) and add the candle columns"""
+    # Nur die benötigten Spalten tokenisieren; saubere Preise direkt als float64 einlesen
+    read_kwargs = dict(engine='c', usecols=lambda col: col in CSV_REQUIRED_COLUMNS)
+    try:
+        data = pd.read_csv(csv_file, dtype=dict.fromkeys(OHLC_COLUMNS, np.float64), **read_kwargs)
+    except ValueError:
+        # Non-numeric cells somewhere: parse again as-is and coerce them to NaN below
+        csv_file.seek(0)
+        data = pd.read_csv(csv_file, **read_kwargs)
+
+    # Validate required columns
+    missing_columns = [col for col in CSV_REQUIRED_COLUMNS if col not in data.columns]
+    if missing_columns:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Missing required columns: {', '.join(missing_columns)}. Required: Date, Open, High, Low, Close"
+        )
+
+    # Process data
+    data['Date'] = pd.to_datetime(data['Date'])
+    data.set_index('Date', inplace=True)
+    data.sort_index(inplace=True)
+
+    # Convert to numeric (only columns the parser could not read as floats)
+    for col in OHLC_COLUMNS:
+        if not pd.api.types.is_float_dtype(data[col]):
+            data[col] = pd.to_numeric(data[col], errors='coerce')
+
+    data.dropna(inplace=True)
+
+    if data.empty:
+        raise HTTPException(status_code=400, detail="No valid data in CSV file")
+
+    # Calculate candle types
+    decimal_places = 5 if data['Close'].median() < 10 else 2
+    return add_candle_columns(data, decimal_places)
+
 @app.post("/api/upload-csv")
 async def upload_csv_data(file: UploadFile = File(...)):
     """Upload CSV file with OHLC data for custom analysis"""
@@ -1216,57 +1810,13 @@ async def upload_csv_data(file: UploadFile = File(...)):
         if not file.filename.endswith('.csv'):
             raise HTTPException(status_code=400, detail="Only CSV files are allowed")
 
-        # Read file content
-        content = await file.read()
-        csv_buffer = io.BytesIO(content)
-
-        # Load CSV into analyzer
+        # Load CSV into analyzer. pandas reads the spooled upload file directly instead of a
+        # second in-memory copy; parsing and candle prep are CPU-bound -> worker thread
         analyzer_instance = ProbabilityAnalyzer()
-
-        # Read CSV with pandas
-        data = pd.read_csv(csv_buffer)
-
-        # Validate required columns
-        required_columns = ['Date', 'Open', 'High', 'Low', 'Close']
-        missing_columns = [col for col in required_columns if col not in data.columns]
-
-        if missing_columns:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Missing required columns: {', '.join(missing_columns)}. Required: Date, Open, High, Low, Close"
-            )
-
-        # Process data
-        data['Date'] = pd.to_datetime(data['Date'])
-        data.set_index('Date', inplace=True)
-        data.sort_index(inplace=True)
-
-        # Convert to numeric
-        for col in ['Open', 'High', 'Low', 'Close']:
-            data[col] = pd.to_numeric(data[col], errors='coerce')
-
-        data.dropna(inplace=True)
-
-        if data.empty:
-            raise HTTPException(status_code=400, detail="No valid data in CSV file")
-
-        # Calculate candle types
-        decimal_places = 5 if data['Close'].median() < 10 else 2
-        data['Open'] = data['Open'].round(decimal_places)
-        data['High'] = data['High'].round(decimal_places)
-        data['Low'] = data['Low'].round(decimal_places)
-        data['Close'] = data['Close'].round(decimal_places)
-
-        data['Price_Change'] = (data['Close'] - data['Open']).round(decimal_places)
-        data['Candle_Type'] = np.where(
-            data['Price_Change'] > 0, 'Bullish',
-            np.where(data['Price_Change'] < 0, 'Bearish', 'Doji')
-        )
+        data = await asyncio.to_thread(parse_ohlc_csv, file.file)
 
         # Store in analyzer
-        analyzer_instance.data = data
-        analyzer_instance.symbol = f"Custom: {file.filename}"
-        analyzer_instance.timeframe = "Custom"
+        analyzer_instance.set_data(data, f"Custom: {file.filename}", "Custom")
 
         logger.info(f"CSV uploaded: {file.filename}, {len(data)} candles")
 
@@ -1278,11 +1828,7 @@ async def upload_csv_data(file: UploadFile = File(...)):
                 "start": data.index[0].strftime('%Y-%m-%d'),
                 "end": data.index[-1].strftime('%Y-%m-%d')
             },
-            "candle_types": {
-                "bullish": int(sum(data['Candle_Type'] == 'Bullish')),
-                "bearish": int(sum(data['Candle_Type'] == 'Bearish')),
-                "doji": int(sum(data['Candle_Type'] == 'Doji'))
-            }
+            "candle_types": analyzer_instance.candle_counts()
         }
 
     except HTTPException:
@@ -1304,7 +1850,7 @@ async def analyze_csv_pattern(pattern: List[str]):
             )
 
         # Calculate probabilities
-        results = analyzer_instance.calculate_probabilities(pattern)
+        results = await asyncio.to_thread(analyzer_instance.calculate_probabilities, pattern)
 
         response = {
             'total_matches': results['total_matches'],
@@ -1321,11 +1867,7 @@ async def analyze_csv_pattern(pattern: List[str]):
                     'start': analyzer_instance.data.index[0].strftime('%Y-%m-%d'),
                     'end': analyzer_instance.data.index[-1].strftime('%Y-%m-%d')
                 },
-                'candle_types': {
-                    'bullish': int(sum(analyzer_instance.data['Candle_Type'] == 'Bullish')),
-                    'bearish': int(sum(analyzer_instance.data['Candle_Type'] == 'Bearish')),
-                    'doji': int(sum(analyzer_instance.data['Candle_Type'] == 'Doji'))
-                }
+                'candle_types': analyzer_instance.candle_counts()
             }
         }
 
@@ -1337,13 +1879,112 @@ async def analyze_csv_pattern(pattern: List[str]):
         logger.error(f"Error analyzing CSV data: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
+# Quotes only move about once a minute; serve repeats from memory. After MARKET_DATA_TTL
+# the old quote is still served (up to MARKET_DATA_STALE_TTL) while one background task refreshes it;
+# past that the entry has expired and the request waits for a fresh quote
+MARKET_DATA_TTL = 30  # seconds
+MARKET_DATA_STALE_TTL = 2 * MARKET_DATA_TTL  # seconds
+_MARKET_DATA_CACHE = TTLCache(maxsize=1024, ttl=MARKET_DATA_STALE_TTL)  # symbol -> (fetched_at, result)
+# Single-flight: at most one upstream fetch per symbol, concurrent requests await the same task
+_MARKET_DATA_INFLIGHT: Dict[str, asyncio.Task] = {}
+
+async def _fetch_and_cache_market_data(symbol: str) -> Dict:
+    """Fetch a quote and store it in the cache"""
+    result = await _fetch_market_data(symbol)
+    # Don't pin demo data in the cache - retry live sources on the next request
+    if result.get('source') != 'Demo data':
+        _MARKET_DATA_CACHE[symbol] = (time.monotonic(), result)
+    return result
+
+def _market_data_fetch_done(symbol: str, task: asyncio.Task):
+    """Release the in-flight slot; log failures nobody awaited (background refreshes)"""
+    if _MARKET_DATA_INFLIGHT.get(symbol) is task:
+        del _MARKET_DATA_INFLIGHT[symbol]
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Quote refresh failed for {symbol}: {task.exception()}")
+
+def _start_market_data_fetch(symbol: str) -> asyncio.Task:
+    """Return the running fetch for a symbol, starting one if none is in flight"""
+    task = _MARKET_DATA_INFLIGHT.get(symbol)
+    if task is None:
+        task = asyncio.create_task(_fetch_and_cache_market_data(symbol))
+        _MARKET_DATA_INFLIGHT[symbol] = task
+        task.add_done_callback(lambda done: _market_data_fetch_done(symbol, done))
+    return task
+
+async def _get_quote(symbol: str) -> Dict:
+    """Quote from the cache, a running fetch, or a new fetch (see MARKET_DATA_TTL)"""
+    cached = _MARKET_DATA_CACHE.get(symbol)
+    if cached is None:
+        # shield: a client disconnect must not cancel the fetch other requests are waiting on
+        return await asyncio.shield(_start_market_data_fetch(symbol))
+
+    fetched_at, result = cached
+    if time.monotonic() - fetched_at >= MARKET_DATA_TTL:
+        _start_market_data_fetch(symbol)  # no-op while a refresh is already running
+    return result
+
 @app.get("/api/market-data/{symbol}")
 async def get_market_data(symbol: str):
+    """Get current market data for a symbol (cached for MARKET_DATA_TTL seconds, then served stale while refreshing)"""
+    return await _get_quote(symbol)
+
+# Upper bound for one batch request (one dashboard refresh)
+MARKET_DATA_BATCH_LIMIT = 50
+
+class MarketDataBatchRequest(BaseModel):
+    symbols: List[str]
+
+@app.post("/api/market-data/batch")
+async def get_market_data_batch(request: MarketDataBatchRequest):
+    """Get market data for several symbols at once; upstream fetches run concurrently"""
+    symbols = list(dict.fromkeys(request.symbols))
+    if len(symbols) > MARKET_DATA_BATCH_LIMIT:
+        raise HTTPException(status_code=400, detail=f"At most {MARKET_DATA_BATCH_LIMIT} symbols per request")
+
+    # Cache and single-flight apply per symbol, so symbols already in flight are not fetched twice
+    results = await asyncio.gather(*(_get_quote(symbol) for symbol in symbols), return_exceptions=True)
+
+    quotes = {}
+    for symbol, result in zip(symbols, results):
+        if isinstance(result, Exception):
+            detail = result.detail if isinstance(result, HTTPException) else str(result)
+            quotes[symbol] = {'symbol': symbol, 'error': detail}
+        else:
+            quotes[symbol] = result
+    return {"quotes": quotes}
+
+def last_valid(values: List, count: int) -> List:
+    """Last `count` non-None values in original order, scanning from the end"""
+    found = []
+    for value in reversed(values):
+        if value is not None:
+            found.append(value)
+            if len(found) == count:
+                break
+    found.reverse()
+    return found
+
+def _new_yf_pool() -> ProcessPoolExecutor:
+    """Worker processes for fetch_yfinance_history"""
+    # spawn statt fork: der Server-Prozess hat bereits Threads und offene SQLite-Verbindungen
+    return ProcessPoolExecutor(max_workers=YF_PROCESS_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+
+async def _yfinance_history(symbol: str) -> pd.DataFrame:
+    """Recent yfinance history from the process pool; a crashed worker gets the pool rebuilt"""
+    pool = app.state.yf_pool
+    try:
+        return await asyncio.get_running_loop().run_in_executor(pool, fetch_yfinance_history, symbol)
+    except BrokenProcessPool:
+        logger.warning("yfinance process pool is broken - recreating it, using a thread for this request")
+        if app.state.yf_pool is pool:  # another request may already have replaced it
+            app.state.yf_pool = _new_yf_pool()
+            pool.shutdown(wait=False, cancel_futures=True)
+        return await asyncio.to_thread(fetch_yfinance_history, symbol)
+
+async def _fetch_market_data(symbol: str) -> Dict:
     """Get current market data for a symbol - Alpha Vantage primary, yfinance fallback"""
     try:
-        import requests
-        import random
-
         # Try Alpha Vantage FIRST (more reliable for quotes)
         api_key = os.environ.get("ALPHAVANTAGE_API_KEY", "demo")
 
@@ -1370,10 +2011,10 @@ async def get_market_data(symbol: str):
                     }
 
                     logger.info(f"Alpha Vantage Forex Quote: {from_currency}/{to_currency}")
-                    response = requests.get(url, params=params, timeout=10)
+                    response = await _ASYNC_HTTP.get(url, params=params)
 
                     if response.status_code == 200:
-                        data = response.json()
+                        data = orjson.loads(response.content)
 
                         # Check for API limit message
                         if 'Note' in data or 'Information' in data:
@@ -1381,11 +2022,10 @@ async def get_market_data(symbol: str):
                         elif 'Time Series FX (Daily)' in data:
                             time_series = data['Time Series FX (Daily)']
 
-                            # Get the two most recent trading days
-                            dates = sorted(time_series.keys(), reverse=True)
+                            # Get the two most recent trading days (ISO dates compare as strings, no full sort)
+                            dates = nlargest(2, time_series)
                             if len(dates) >= 2:
-                                latest_date = dates[0]
-                                prev_date = dates[1]
+                                latest_date, prev_date = dates
 
                                 current_price = float(time_series[latest_date]['4. close'])
                                 prev_close = float(time_series[prev_date]['4. close'])
@@ -1412,10 +2052,10 @@ async def get_market_data(symbol: str):
                     }
 
                     logger.info(f"Alpha Vantage Quote: {api_symbol}")
-                    response = requests.get(url, params=params, timeout=10)
+                    response = await _ASYNC_HTTP.get(url, params=params)
 
                     if response.status_code == 200:
-                        data = response.json()
+                        data = orjson.loads(response.content)
 
                         # Check for API limit message
                         if 'Note' in data or 'Information' in data:
@@ -1463,18 +2103,18 @@ async def get_market_data(symbol: str):
             }
 
             logger.info(f"Trying Yahoo v8 API for {symbol}")
-            response = requests.get(url, params=params, headers=headers, timeout=10)
+            response = await _ASYNC_HTTP.get(url, params=params, headers=headers)
 
             if response.status_code == 200:
-                json_data = response.json()
+                json_data = orjson.loads(response.content)
 
                 if 'chart' in json_data and 'result' in json_data['chart']:
                     result = json_data['chart']['result'][0]
 
                     if 'timestamp' in result and 'indicators' in result:
                         quote = result['indicators']['quote'][0]
-                        closes = [c for c in quote.get('close', []) if c is not None]
-                        volumes = [v for v in quote.get('volume', []) if v is not None]
+                        closes = last_valid(quote.get('close') or [], 2)
+                        volumes = last_valid(quote.get('volume') or [], 1)
 
                         if len(closes) >= 2:
                             current_price = float(closes[-1])
@@ -1496,21 +2136,8 @@ async def get_market_data(symbol: str):
 
         # Fallback 2: yfinance library
         try:
-            user_agents = [
-                'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
-                'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
-            ]
-
-            session = requests.Session()
-            session.headers.update({
-                'User-Agent': random.choice(user_agents),
-                'Accept': 'application/json',
-                'Accept-Language': 'en-US,en;q=0.9',
-            })
-
             logger.info(f"Trying yfinance library for {symbol}")
-            ticker = yf.Ticker(symbol, session=session)
-            hist = ticker.history(period="5d", timeout=10)
+            hist = await _yfinance_history(symbol)
 
             if len(hist) >= 2:
                 current_price = float(hist['Close'].iloc[-1])
@@ -1559,12 +2186,52 @@ async def get_market_data(symbol: str):
         logger.error(f"Error getting market data for {symbol}: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Headlines change on a minute scale; keep NewsAPI responses for NEWS_TTL seconds.
+# A background task renews the cache shortly before it expires, but only while someone
+# is reading it - the free NewsAPI tier allows 100 requests per day.
+NEWS_TTL = 300  # seconds
+NEWS_REFRESH_INTERVAL = 240  # seconds
+# The payload is kept serialized and gzipped, so compression runs once per refresh
+_NEWS_CACHE = {"ts": 0.0, "json": None, "json_gz": None, "requested": False}
+_NEWS_LOCK = asyncio.Lock()
+
+def _cached_news(accept_encoding: Optional[str]) -> Optional[Response]:
+    """Return the cached NewsAPI response if it is still fresh"""
+    _NEWS_CACHE["requested"] = True
+    if _NEWS_CACHE["json"] is not None and time.monotonic() - _NEWS_CACHE["ts"] < NEWS_TTL:
+        return _precompressed_response(_NEWS_CACHE["json"], _NEWS_CACHE["json_gz"], accept_encoding)
+    return None
+
+async def _refresh_news_periodically():
+    """Renew the NewsAPI cache before it expires, so page loads never wait on NewsAPI"""
+    while True:
+        await asyncio.sleep(NEWS_REFRESH_INTERVAL)
+        if not os.environ.get("NEWS_API_KEY") or not _NEWS_CACHE["requested"]:
+            continue
+        _NEWS_CACHE["requested"] = False
+        try:
+            async with _NEWS_LOCK:
+                await _fetch_financial_news()
+        except Exception as e:
+            logger.warning(f"Refreshing news failed: {e}")
+
 @app.get("/api/news")
-async def get_financial_news():
+async def get_financial_news(accept_encoding: Optional[str] = Header(None)):
+    """Get latest financial news from NewsAPI (cached for NEWS_TTL seconds)"""
+    cached = _cached_news(accept_encoding)
+    if cached is not None:
+        return cached
+
+    # Only one request refreshes the cache; the others wait and reuse its result
+    async with _NEWS_LOCK:
+        cached = _cached_news(accept_encoding)
+        if cached is not None:
+            return cached
+        return await _fetch_financial_news()
+
+async def _fetch_financial_news() -> Dict:
     """Get latest financial news from NewsAPI"""
     try:
-        import requests
-
         # ========================================
         # NEWS API KEY - Wird aus Environment Variable gelesen
         # ========================================
@@ -1581,18 +2248,23 @@ async def get_financial_news():
                     "apiKey": NEWS_API_KEY
                 }
 
-                response = requests.get(url, params=params, timeout=10)
+                response = await _ASYNC_HTTP.get(url, params=params)
 
                 if response.status_code == 200:
-                    data = response.json()
+                    data = orjson.loads(response.content)
 
                     if data.get("status") == "ok":
                         logger.info(f"Loaded {len(data.get('articles', []))} articles from NewsAPI")
-                        return {
+                        payload = {
                             "status": "success",
                             "totalResults": data.get("totalResults", 0),
                             "articles": data.get("articles", [])
                         }
+                        news_json = orjson.dumps(payload)
+                        _NEWS_CACHE["json_gz"] = gzip.compress(news_json, GZIP_LEVEL)
+                        _NEWS_CACHE["json"] = news_json
+                        _NEWS_CACHE["ts"] = time.monotonic()
+                        return payload
                     else:
                         logger.warning(f"NewsAPI returned error: {data.get('message', 'Unknown error')}")
                 else:
@@ -1672,92 +2344,144 @@ async def get_financial_news():
         logger.error(f"Error fetching news: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Economic indicators mapping for different countries (static values except FRED-backed USA)
+ECONOMIC_INDICATORS = {
+    "USA": [
+        {"name": "Interest Rate (Fed Funds)", "fred_id": "FEDFUNDS", "unit": "%"},
+        {"name": "Inflation Rate (CPI YoY)", "fred_id": "CPIAUCSL", "unit": "%", "transform": "pc1"},
+        {"name": "Unemployment Rate", "fred_id": "UNRATE", "unit": "%"},
+        {"name": "GDP Growth Rate (QoQ)", "fred_id": "A191RL1Q225SBEA", "unit": "%"},
+        {"name": "Manufacturing PMI", "fred_id": "MANEMP", "unit": "Index"},
+        {"name": "Retail Sales (MoM)", "fred_id": "RSXFS", "unit": "%", "transform": "pc1"},
+        {"name": "Consumer Confidence", "fred_id": "UMCSENT", "unit": "Index"},
+    ],
+    "EUR": [
+        {"name": "ECB Interest Rate", "value": "4.00", "previous": "4.50", "change": -11.1, "lastUpdated": "2025-01"},
+        {"name": "Inflation Rate (HICP)", "value": "2.4%", "previous": "2.7%", "change": -11.1, "lastUpdated": "2025-09"},
+        {"name": "Unemployment Rate", "value": "6.4%", "previous": "6.5%", "change": -1.5, "lastUpdated": "2025-08"},
+        {"name": "GDP Growth Rate", "value": "0.4%", "previous": "0.2%", "change": 100, "lastUpdated": "2025-Q3"},
+        {"name": "Manufacturing PMI", "value": "46.1", "previous": "45.2", "change": 2.0, "lastUpdated": "2025-09"},
+    ],
+    "GBR": [
+        {"name": "BoE Interest Rate", "value": "4.75%", "previous": "5.00%", "change": -5.0, "lastUpdated": "2025-02"},
+        {"name": "Inflation Rate (CPI)", "value": "2.6%", "previous": "2.3%", "change": 13.0, "lastUpdated": "2025-09"},
+        {"name": "Unemployment Rate", "value": "4.0%", "previous": "4.0%", "change": 0, "lastUpdated": "2025-08"},
+        {"name": "GDP Growth Rate", "value": "0.1%", "previous": "0.5%", "change": -80.0, "lastUpdated": "2025-Q3"},
+        {"name": "Manufacturing PMI", "value": "48.6", "previous": "51.5", "change": -5.6, "lastUpdated": "2025-09"},
+    ],
+    "JPN": [
+        {"name": "BoJ Interest Rate", "value": "0.25%", "previous": "0.10%", "change": 150.0, "lastUpdated": "2025-07"},
+        {"name": "Inflation Rate (Core CPI)", "value": "2.4%", "previous": "2.8%", "change": -14.3, "lastUpdated": "2025-09"},
+        {"name": "Unemployment Rate", "value": "2.5%", "previous": "2.5%", "change": 0, "lastUpdated": "2025-08"},
+        {"name": "GDP Growth Rate", "value": "0.7%", "previous": "0.5%", "change": 40.0, "lastUpdated": "2025-Q3"},
+        {"name": "Manufacturing PMI", "value": "49.0", "previous": "49.8", "change": -1.6, "lastUpdated": "2025-09"},
+    ],
+    "CAN": [
+        {"name": "BoC Interest Rate", "value": "3.25%", "previous": "3.75%", "change": -13.3, "lastUpdated": "2025-03"},
+        {"name": "Inflation Rate (CPI)", "value": "1.6%", "previous": "2.0%", "change": -20.0, "lastUpdated": "2025-09"},
+        {"name": "Unemployment Rate", "value": "6.6%", "previous": "6.5%", "change": 1.5, "lastUpdated": "2025-09"},
+        {"name": "GDP Growth Rate", "value": "0.0%", "previous": "0.2%", "change": -100.0, "lastUpdated": "2025-Q3"},
+        {"name": "Manufacturing PMI", "value": "51.1", "previous": "49.5", "change": 3.2, "lastUpdated": "2025-09"},
+    ],
+    "AUS": [
+        {"name": "RBA Interest Rate", "value": "4.35%", "previous": "4.35%", "change": 0, "lastUpdated": "2025-09"},
+        {"name": "Inflation Rate (CPI)", "value": "2.8%", "previous": "3.8%", "change": -26.3, "lastUpdated": "2025-Q3"},
+        {"name": "Unemployment Rate", "value": "4.1%", "previous": "4.1%", "change": 0, "lastUpdated": "2025-09"},
+        {"name": "GDP Growth Rate", "value": "1.0%", "previous": "1.1%", "change": -9.1, "lastUpdated": "2025-Q2"},
+        {"name": "Manufacturing PMI", "value": "47.3", "previous": "48.7", "change": -2.9, "lastUpdated": "2025-09"},
+    ],
+    "NZL": [
+        {"name": "RBNZ Interest Rate", "value": "4.25%", "previous": "4.75%", "change": -10.5, "lastUpdated": "2025-02"},
+        {"name": "Inflation Rate (CPI)", "value": "2.2%", "previous": "3.3%", "change": -33.3, "lastUpdated": "2025-Q3"},
+        {"name": "Unemployment Rate", "value": "4.8%", "previous": "4.6%", "change": 4.3, "lastUpdated": "2025-Q3"},
+        {"name": "GDP Growth Rate", "value": "-0.2%", "previous": "0.2%", "change": -200.0, "lastUpdated": "2025-Q2"},
+        {"name": "Manufacturing PMI", "value": "46.9", "previous": "44.9", "change": 4.5, "lastUpdated": "2025-09"},
+    ],
+    "CHE": [
+        {"name": "SNB Interest Rate", "value": "1.00%", "previous": "1.25%", "change": -20.0, "lastUpdated": "2025-03"},
+        {"name": "Inflation Rate (CPI)", "value": "0.8%", "previous": "1.1%", "change": -27.3, "lastUpdated": "2025-09"},
+        {"name": "Unemployment Rate", "value": "2.6%", "previous": "2.5%", "change": 4.0, "lastUpdated": "2025-09"},
+        {"name": "GDP Growth Rate", "value": "0.7%", "previous": "0.5%", "change": 40.0, "lastUpdated": "2025-Q2"},
+        {"name": "Manufacturing PMI", "value": "50.8", "previous": "47.4", "change": 7.2, "lastUpdated": "2025-09"},
+    ],
+    "CHN": [
+        {"name": "PBoC Interest Rate (1Y LPR)", "value": "3.10%", "previous": "3.45%", "change": -10.1, "lastUpdated": "2025-02"},
+        {"name": "Inflation Rate (CPI)", "value": "0.4%", "previous": "0.6%", "change": -33.3, "lastUpdated": "2025-09"},
+        {"name": "Unemployment Rate", "value": "5.1%", "previous": "5.2%", "change": -1.9, "lastUpdated": "2025-08"},
+        {"name": "GDP Growth Rate", "value": "4.6%", "previous": "4.7%", "change": -2.1, "lastUpdated": "2025-Q3"},
+        {"name": "Manufacturing PMI", "value": "49.8", "previous": "49.1", "change": 1.4, "lastUpdated": "2025-09"},
+    ],
+    "DEU": [
+        {"name": "ECB Interest Rate", "value": "4.00%", "previous": "4.50%", "change": -11.1, "lastUpdated": "2025-01"},
+        {"name": "Inflation Rate (CPI)", "value": "2.0%", "previous": "1.7%", "change": 17.6, "lastUpdated": "2025-09"},
+        {"name": "Unemployment Rate", "value": "6.1%", "previous": "6.0%", "change": 1.7, "lastUpdated": "2025-09"},
+        {"name": "GDP Growth Rate", "value": "-0.1%", "previous": "0.1%", "change": -200.0, "lastUpdated": "2025-Q3"},
+        {"name": "Manufacturing PMI", "value": "42.6", "previous": "42.4", "change": 0.5, "lastUpdated": "2025-09"},
+    ],
+}
+
+# Static indicator lists in response format, serialized once
+STATIC_INDICATORS_JSON = {
+    country: orjson.dumps([
+        {
+            "name": indicator["name"],
+            "current": indicator["value"],
+            "previous": indicator.get("previous", "N/A"),
+            "change": indicator.get("change", 0),
+            "lastUpdated": indicator.get("lastUpdated", "N/A")
+        }
+        for indicator in indicators if "value" in indicator
+    ])
+    for country, indicators in ECONOMIC_INDICATORS.items()
+}
+
+async def _fetch_fred_indicator(indicator: Dict, fred_api_key: str) -> Optional[Dict]:
+    """Fetch the latest two FRED observations for one indicator in response format"""
+    params = {
+        "series_id": indicator.get("fred_id"),
+        "api_key": fred_api_key,
+        "file_type": "json",
+        "limit": 2,
+        "sort_order": "desc"
+    }
+    response = await _ASYNC_HTTP.get("https://api.stlouisfed.org/fred/series/observations", params=params)
+    if response.status_code != 200:
+        logger.warning(f"FRED HTTP error {response.status_code} for {indicator['name']}")
+        return None
+
+    observations = orjson.loads(response.content).get("observations", [])
+    if len(observations) < 2:
+        logger.warning(f"Not enough data for {indicator['name']}")
+        return None
+
+    current_val = float(observations[0]["value"])
+    previous_val = float(observations[1]["value"])
+    change_pct = ((current_val - previous_val) / previous_val * 100) if previous_val != 0 else 0
+
+    return {
+        "name": indicator["name"],
+        "current": f"{current_val:.2f}{indicator.get('unit', '')}",
+        "previous": f"{previous_val:.2f}{indicator.get('unit', '')}",
+        "change": change_pct,
+        "lastUpdated": observations[0]["date"]
+    }
+
+# FRED publishes these series at most daily; keep live responses for a few hours per day
+ECONOMIC_CACHE_TTL = 3 * 3600  # seconds
+_ECONOMIC_CACHE = TTLCache(maxsize=16, ttl=ECONOMIC_CACHE_TTL)
+
 @app.get("/api/economic/{country}")
 async def get_economic_data(country: str):
     """Get economic indicators for a specific country"""
     try:
-        import requests
-        from datetime import datetime
-
-        # Economic indicators mapping for different countries
-        ECONOMIC_INDICATORS = {
-            "USA": [
-                {"name": "Interest Rate (Fed Funds)", "fred_id": "FEDFUNDS", "unit": "%"},
-                {"name": "Inflation Rate (CPI YoY)", "fred_id": "CPIAUCSL", "unit": "%", "transform": "pc1"},
-                {"name": "Unemployment Rate", "fred_id": "UNRATE", "unit": "%"},
-                {"name": "GDP Growth Rate (QoQ)", "fred_id": "A191RL1Q225SBEA", "unit": "%"},
-                {"name": "Manufacturing PMI", "fred_id": "MANEMP", "unit": "Index"},
-                {"name": "Retail Sales (MoM)", "fred_id": "RSXFS", "unit": "%", "transform": "pc1"},
-                {"name": "Consumer Confidence", "fred_id": "UMCSENT", "unit": "Index"},
-            ],
-            "EUR": [
-                {"name": "ECB Interest Rate", "value": "4.00", "previous": "4.50", "change": -11.1, "lastUpdated": "2025-01"},
-                {"name": "Inflation Rate (HICP)", "value": "2.4%", "previous": "2.7%", "change": -11.1, "lastUpdated": "2025-09"},
-                {"name": "Unemployment Rate", "value": "6.4%", "previous": "6.5%", "change": -1.5, "lastUpdated": "2025-08"},
-                {"name": "GDP Growth Rate", "value": "0.4%", "previous": "0.2%", "change": 100, "lastUpdated": "2025-Q3"},
-                {"name": "Manufacturing PMI", "value": "46.1", "previous": "45.2", "change": 2.0, "lastUpdated": "2025-09"},
-            ],
-            "GBR": [
-                {"name": "BoE Interest Rate", "value": "4.75%", "previous": "5.00%", "change": -5.0, "lastUpdated": "2025-02"},
-                {"name": "Inflation Rate (CPI)", "value": "2.6%", "previous": "2.3%", "change": 13.0, "lastUpdated": "2025-09"},
-                {"name": "Unemployment Rate", "value": "4.0%", "previous": "4.0%", "change": 0, "lastUpdated": "2025-08"},
-                {"name": "GDP Growth Rate", "value": "0.1%", "previous": "0.5%", "change": -80.0, "lastUpdated": "2025-Q3"},
-                {"name": "Manufacturing PMI", "value": "48.6", "previous": "51.5", "change": -5.6, "lastUpdated": "2025-09"},
-            ],
-            "JPN": [
-                {"name": "BoJ Interest Rate", "value": "0.25%", "previous": "0.10%", "change": 150.0, "lastUpdated": "2025-07"},
-                {"name": "Inflation Rate (Core CPI)", "value": "2.4%", "previous": "2.8%", "change": -14.3, "lastUpdated": "2025-09"},
-                {"name": "Unemployment Rate", "value": "2.5%", "previous": "2.5%", "change": 0, "lastUpdated": "2025-08"},
-                {"name": "GDP Growth Rate", "value": "0.7%", "previous": "0.5%", "change": 40.0, "lastUpdated": "2025-Q3"},
-                {"name": "Manufacturing PMI", "value": "49.0", "previous": "49.8", "change": -1.6, "lastUpdated": "2025-09"},
-            ],
-            "CAN": [
-                {"name": "BoC Interest Rate", "value": "3.25%", "previous": "3.75%", "change": -13.3, "lastUpdated": "2025-03"},
-                {"name": "Inflation Rate (CPI)", "value": "1.6%", "previous": "2.0%", "change": -20.0, "lastUpdated": "2025-09"},
-                {"name": "Unemployment Rate", "value": "6.6%", "previous": "6.5%", "change": 1.5, "lastUpdated": "2025-09"},
-                {"name": "GDP Growth Rate", "value": "0.0%", "previous": "0.2%", "change": -100.0, "lastUpdated": "2025-Q3"},
-                {"name": "Manufacturing PMI", "value": "51.1", "previous": "49.5", "change": 3.2, "lastUpdated": "2025-09"},
-            ],
-            "AUS": [
-                {"name": "RBA Interest Rate", "value": "4.35%", "previous": "4.35%", "change": 0, "lastUpdated": "2025-09"},
-                {"name": "Inflation Rate (CPI)", "value": "2.8%", "previous": "3.8%", "change": -26.3, "lastUpdated": "2025-Q3"},
-                {"name": "Unemployment Rate", "value": "4.1%", "previous": "4.1%", "change": 0, "lastUpdated": "2025-09"},
-                {"name": "GDP Growth Rate", "value": "1.0%", "previous": "1.1%", "change": -9.1, "lastUpdated": "2025-Q2"},
-                {"name": "Manufacturing PMI", "value": "47.3", "previous": "48.7", "change": -2.9, "lastUpdated": "2025-09"},
-            ],
-            "NZL": [
-                {"name": "RBNZ Interest Rate", "value": "4.25%", "previous": "4.75%", "change": -10.5, "lastUpdated": "2025-02"},
-                {"name": "Inflation Rate (CPI)", "value": "2.2%", "previous": "3.3%", "change": -33.3, "lastUpdated": "2025-Q3"},
-                {"name": "Unemployment Rate", "value": "4.8%", "previous": "4.6%", "change": 4.3, "lastUpdated": "2025-Q3"},
-                {"name": "GDP Growth Rate", "value": "-0.2%", "previous": "0.2%", "change": -200.0, "lastUpdated": "2025-Q2"},
-                {"name": "Manufacturing PMI", "value": "46.9", "previous": "44.9", "change": 4.5, "lastUpdated": "2025-09"},
-            ],
-            "CHE": [
-                {"name": "SNB Interest Rate", "value": "1.00%", "previous": "1.25%", "change": -20.0, "lastUpdated": "2025-03"},
-                {"name": "Inflation Rate (CPI)", "value": "0.8%", "previous": "1.1%", "change": -27.3, "lastUpdated": "2025-09"},
-                {"name": "Unemployment Rate", "value": "2.6%", "previous": "2.5%", "change": 4.0, "lastUpdated": "2025-09"},
-                {"name": "GDP Growth Rate", "value": "0.7%", "previous": "0.5%", "change": 40.0, "lastUpdated": "2025-Q2"},
-                {"name": "Manufacturing PMI", "value": "50.8", "previous": "47.4", "change": 7.2, "lastUpdated": "2025-09"},
-            ],
-            "CHN": [
-                {"name": "PBoC Interest Rate (1Y LPR)", "value": "3.10%", "previous": "3.45%", "change": -10.1, "lastUpdated": "2025-02"},
-                {"name": "Inflation Rate (CPI)", "value": "0.4%", "previous": "0.6%", "change": -33.3, "lastUpdated": "2025-09"},
-                {"name": "Unemployment Rate", "value": "5.1%", "previous": "5.2%", "change": -1.9, "lastUpdated": "2025-08"},
-                {"name": "GDP Growth Rate", "value": "4.6%", "previous": "4.7%", "change": -2.1, "lastUpdated": "2025-Q3"},
-                {"name": "Manufacturing PMI", "value": "49.8", "previous": "49.1", "change": 1.4, "lastUpdated": "2025-09"},
-            ],
-            "DEU": [
-                {"name": "ECB Interest Rate", "value": "4.00%", "previous": "4.50%", "change": -11.1, "lastUpdated": "2025-01"},
-                {"name": "Inflation Rate (CPI)", "value": "2.0%", "previous": "1.7%", "change": 17.6, "lastUpdated": "2025-09"},
-                {"name": "Unemployment Rate", "value": "6.1%", "previous": "6.0%", "change": 1.7, "lastUpdated": "2025-09"},
-                {"name": "GDP Growth Rate", "value": "-0.1%", "previous": "0.1%", "change": -200.0, "lastUpdated": "2025-Q3"},
-                {"name": "Manufacturing PMI", "value": "42.6", "previous": "42.4", "change": 0.5, "lastUpdated": "2025-09"},
-            ],
-        }
-
         if country not in ECONOMIC_INDICATORS:
             raise HTTPException(status_code=404, detail=f"Country {country} not found")
 
+        cache_key = (country, datetime.now().date().isoformat())
+        cached = _ECONOMIC_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+
         indicators_config = ECONOMIC_INDICATORS[country]
         result_indicators = []
 
@@ -1767,66 +2491,34 @@ async def get_economic_data(country: str):
 
             if fred_api_key:
                 logger.info("Fetching real-time data from FRED API")
-                for indicator in indicators_config:
-                    try:
-                        fred_id = indicator.get("fred_id")
-                        url = f"https://api.stlouisfed.org/fred/series/observations"
-                        params = {
-                            "series_id": fred_id,
-                            "api_key": fred_api_key,
-                            "file_type": "json",
-                            "limit": 2,
-                            "sort_order": "desc"
-                        }
-
-                        response = requests.get(url, params=params, timeout=10)
-                        if response.status_code == 200:
-                            data = response.json()
-                            observations = data.get("observations", [])
-
-                            if len(observations) >= 2:
-                                current_val = float(observations[0]["value"])
-                                previous_val = float(observations[1]["value"])
-                                change_pct = ((current_val - previous_val) / previous_val * 100) if previous_val != 0 else 0
-
-                                result_indicators.append({
-                                    "name": indicator["name"],
-                                    "current": f"{current_val:.2f}{indicator.get('unit', '')}",
-                                    "previous": f"{previous_val:.2f}{indicator.get('unit', '')}",
-                                    "change": change_pct,
-                                    "lastUpdated": observations[0]["date"]
-                                })
-                            else:
-                                logger.warning(f"Not enough data for {indicator['name']}")
-                    except Exception as e:
-                        logger.error(f"Error fetching {indicator.get('name')}: {e}")
-                        continue
+                # Alle Indikatoren parallel abfragen statt nacheinander
+                results = await asyncio.gather(
+                    *(_fetch_fred_indicator(indicator, fred_api_key) for indicator in indicators_config),
+                    return_exceptions=True
+                )
+                for indicator, result in zip(indicators_config, results):
+                    if isinstance(result, Exception):
+                        logger.error(f"Error fetching {indicator.get('name')}: {result}")
+                    elif result is not None:
+                        result_indicators.append(result)
 
                 if result_indicators:
-                    return {
+                    result = {
                         "country": country,
                         "indicators": result_indicators,
                         "timestamp": datetime.now().isoformat(),
                         "source": "FRED API"
                     }
+                    _ECONOMIC_CACHE[cache_key] = result
+                    return result
 
-        # Fallback to static data (for all countries or if FRED fails)
-        for indicator in indicators_config:
-            if "value" in indicator:
-                result_indicators.append({
-                    "name": indicator["name"],
-                    "current": indicator["value"],
-                    "previous": indicator.get("previous", "N/A"),
-                    "change": indicator.get("change", 0),
-                    "lastUpdated": indicator.get("lastUpdated", "N/A")
-                })
-
-        return {
+        # Fallback to static data (for all countries or if FRED fails), serialized at import
+        return ORJSONResponse({
             "country": country,
-            "indicators": result_indicators,
+            "indicators": orjson.Fragment(STATIC_INDICATORS_JSON[country]),
             "timestamp": datetime.now().isoformat(),
             "source": "Static Data (Update: Consider FRED API key for live USA data)"
-        }
+        })
 
     except HTTPException:
         raise
@@ -1838,8 +2530,6 @@ async def get_economic_data(country: str):
 async def get_cot_data():
     """Get COT (Commitment of Traders) data for institutional positioning - V1.1.2"""
     try:
-        import requests
-
         # Get optional NASDAQ API key from environment
         nasdaq_api_key = os.environ.get("NASDAQ_API_KEY", "")
 
@@ -1876,10 +2566,10 @@ async def get_cot_data():
                 '$order': 'report_date_as_yyyy_mm_dd DESC'
             }
 
-            response = requests.get(base_url, params=params, timeout=30)
+            response = _HTTP.get(base_url, params=params, timeout=30)
 
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
 
                 # Map CFTC market names to display names (exact match patterns)
                 cftc_map = {
@@ -1953,10 +2643,10 @@ async def get_cot_data():
                             'order': 'desc'
                         }
 
-                        response = requests.get(url, params=params, timeout=10)
+                        response = _HTTP.get(url, params=params, timeout=10)
 
                         if response.status_code == 200:
-                            data = response.json()
+                            data = orjson.loads(response.content)
                             dataset = data.get('dataset', {})
                             dataset_data = dataset.get('data', [])
 
@@ -2060,22 +2750,104 @@ async def get_cot_data():
         logger.error(f"Error in COT data endpoint: {str(e)}")
         raise HTTPException(status_code=500, detail=f"COT data fetch failed: {str(e)}")
 
+@lru_cache(maxsize=1)
+def _fred_client():
+    """Import fredapi and build the FRED client once, on first use"""
+    from fredapi import Fred
+    warnings.filterwarnings('ignore')
+
+    # FRED API Key - aus Environment Variable oder Standard
+    FRED_API_KEY = os.environ.get("FRED_API_KEY", "a650cab7da43489ec04d1073446a338f")
+    return Fred(api_key=FRED_API_KEY)
+
+# The analysis only moves with daily FRED updates; cache the finished response per end date
+RISK_RADAR_CACHE_TTL = 6 * 3600  # seconds
+_RISK_RADAR_CACHE = TTLCache(maxsize=2, ttl=RISK_RADAR_CACHE_TTL)
+
+# Regime codes produced by _risk_scores, ordered by stress level
+RISK_REGIMES = np.array(["CALM", "WATCH", "WARNING", "ALERT"])
+RISK_WATCH_CODE = 1  # lowest regime that counts as an alert
+
+def _risk_kernel(z_values: np.ndarray, weights: np.ndarray, thresholds: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Composite score and regime code per row in one pass (JIT-compiled when numba is installed)"""
+    n_rows, n_cols = z_values.shape
+    composite = np.empty(n_rows, np.float64)
+    regimes = np.zeros(n_rows, np.int8)
+    for i in range(n_rows):
+        total_weight = 0.0
+        weighted_sum = 0.0
+        flags = 0
+        available = 0
+        for j in range(n_cols):
+            z = z_values[i, j]
+            if not np.isnan(z):
+                total_weight += weights[j]
+                weighted_sum += z * weights[j]
+                available += 1
+                if z >= thresholds[j]:
+                    flags += 1
+        if total_weight == 0.0:
+            composite[i] = np.nan
+            continue
+
+        cs = weighted_sum / total_weight
+        flag_ratio = flags / max(available, 1)
+        composite[i] = cs
+        if cs >= 2.5 or (cs >= 2.0 and flag_ratio >= 0.75):
+            regimes[i] = 3
+        elif cs >= 1.75 or (flag_ratio >= 0.75 and cs >= 1.25):
+            regimes[i] = 2
+        elif cs >= 1.0 or (flag_ratio >= 0.6 and cs >= 0.5):
+            regimes[i] = 1
+    return composite, regimes
+
+if NUMBA_AVAILABLE:
+    _risk_kernel = njit(cache=True, boundscheck=False)(_risk_kernel)
+
+def _risk_scores(z_values: np.ndarray, weights: np.ndarray, thresholds: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Weighted composite of the available z-scores per row plus its RISK_REGIMES code"""
+    if NUMBA_AVAILABLE:
+        return _risk_kernel(z_values, weights, thresholds)
+
+    # Gewichteter Mittelwert je Zeile; fehlende Z-Scores fallen raus, Gewichte werden renormalisiert
+    available = ~np.isnan(z_values)
+    row_weights = np.where(available, weights, 0.0)
+    total_weight = row_weights.sum(axis=1)
+    weighted_sum = (np.where(available, z_values, 0.0) * row_weights).sum(axis=1)
+    cs = weighted_sum / np.where(total_weight > 0, total_weight, np.nan)
+
+    flags = (z_values >= thresholds).sum(axis=1)  # NaN vergleicht immer False
+    flag_ratio = flags / np.maximum(available.sum(axis=1), 1)
+    regimes = np.select(
+        [
+            (cs >= 2.5) | ((cs >= 2.0) & (flag_ratio >= 0.75)),
+            (cs >= 1.75) | ((flag_ratio >= 0.75) & (cs >= 1.25)),
+            (cs >= 1.0) | ((flag_ratio >= 0.6) & (cs >= 0.5)),
+        ],
+        [3, 2, 1],
+        default=0
+    ).astype(np.int8)
+    return cs, regimes
+
+def warm_up_risk_kernel():
+    """Compile the risk radar kernel at startup instead of on the first request"""
+    if NUMBA_AVAILABLE:
+        _risk_kernel(np.zeros((1, 4)), np.ones(4), np.ones(4))
+
 @app.get("/api/risk-radar")
 async def get_risk_radar():
     """Get Risk Radar market stress analysis"""
     try:
-        from fredapi import Fred
-        import warnings
-        warnings.filterwarnings('ignore')
-
-        # FRED API Key - aus Environment Variable oder Standard
-        FRED_API_KEY = os.environ.get("FRED_API_KEY", "a650cab7da43489ec04d1073446a338f")
-        fred = Fred(api_key=FRED_API_KEY)
-
         # Daten laden (letzte 3 Jahre für Z-Score Berechnung)
         start_date = (datetime.now() - timedelta(days=3*365)).strftime("%Y-%m-%d")
         end_date = datetime.now().strftime("%Y-%m-%d")
 
+        cached = _RISK_RADAR_CACHE.get(end_date)
+        if cached is not None:
+            return cached
+
+        fred = _fred_client()
+
         logger.info(f"Loading Risk Radar data from {start_date} to {end_date}")
 
         # Basis-Indikatoren laden
@@ -2086,15 +2858,20 @@ async def get_risk_radar():
             'VIXCLS': 'VIX'                # VIX Volatility Index
         }
 
+        # fredapi ist synchron: alle Serien parallel in Worker-Threads laden
+        results = await asyncio.gather(
+            *(asyncio.to_thread(fred.get_series, fred_code, observation_start=start_date, observation_end=end_date)
+              for fred_code in series_config),
+            return_exceptions=True
+        )
+
         data_series = {}
-        for fred_code, name in series_config.items():
-            try:
-                series = fred.get_series(fred_code, observation_start=start_date, observation_end=end_date)
-                if series is not None and len(series) > 0:
-                    data_series[name] = series
-                    logger.info(f"Loaded {name}: {len(series)} data points")
-            except Exception as e:
-                logger.warning(f"Could not load {name}: {e}")
+        for name, series in zip(series_config.values(), results):
+            if isinstance(series, Exception):
+                logger.warning(f"Could not load {name}: {series}")
+            elif series is not None and len(series) > 0:
+                data_series[name] = series
+                logger.info(f"Loaded {name}: {len(series)} data points")
 
         if not data_series:
             raise ValueError("Could not load any FRED data series")
@@ -2103,18 +2880,11 @@ async def get_risk_radar():
         df = pd.concat(data_series.values(), axis=1, keys=data_series.keys()).sort_index()
         df = df.asfreq("B").ffill()
 
-        # Z-Scores berechnen (252 Tage Lookback)
+        # Z-Scores berechnen (252 Tage Lookback), alle Spalten in einem Rolling-Durchlauf
         lookback = 252
-
-        def rolling_z(x, lb=lookback):
-            rolling_mean = x.rolling(window=lb, min_periods=int(lb*0.8)).mean()
-            rolling_std = x.rolling(window=lb, min_periods=int(lb*0.8)).std()
-            z_score = (x - rolling_mean) / rolling_std
-            return z_score
-
-        for col in df.columns:
-            df[f"{col}_Z"] = rolling_z(df[col])
-            df[f"{col}_Z"] = df[f"{col}_Z"].clip(-3, 3)
+        rolling = df.rolling(window=lookback, min_periods=int(lookback*0.8))
+        z_scores = ((df - rolling.mean()) / rolling.std()).clip(-3, 3)
+        df = df.join(z_scores.add_suffix('_Z'))
 
         # Daten bereinigen
         z_cols = [col for col in df.columns if col.endswith('_Z')]
@@ -2131,55 +2901,19 @@ async def get_risk_radar():
             "VIX_Z": 0.25
         }
 
-        def calculate_composite_flexible(row):
-            available_scores = {}
-            for col, weight in base_weights.items():
-                if col in row.index and pd.notna(row[col]):
-                    available_scores[col] = (row[col], weight)
-
-            if not available_scores:
-                return np.nan
-
-            total_weight = sum(weight for _, weight in available_scores.values())
-            normalized_composite = sum(score * (weight/total_weight)
-                                     for score, weight in available_scores.values())
-            return normalized_composite
-
-        df["Composite_Z"] = df.apply(calculate_composite_flexible, axis=1)
-        df = df.dropna(subset=["Composite_Z"])
-
-        # Regime klassifizieren
-        def classify_regime(row):
-            cs = row["Composite_Z"]
-            flags = 0
-            available_indicators = 0
-
-            for col in base_weights.keys():
-                if col in row.index and pd.notna(row[col]):
-                    available_indicators += 1
-                    threshold = 1.0 if 'STLFSI_Z' in col else 1.5
-                    if row[col] >= threshold:
-                        flags += 1
-
-            flag_ratio = flags / max(available_indicators, 1)
-
-            if cs >= 2.5:
-                return "ALERT"
-            elif cs >= 2.0 and flag_ratio >= 0.75:
-                return "ALERT"
-            elif cs >= 1.75:
-                return "WARNING"
-            elif flag_ratio >= 0.75 and cs >= 1.25:
-                return "WARNING"
-            elif cs >= 1.0:
-                return "WATCH"
-            elif flag_ratio >= 0.6 and cs >= 0.5:
-                return "WATCH"
-            else:
-                return "CALM"
+        # Composite Score und Regime in einem Durchlauf über die Z-Scores
+        weight_cols = [col for col in base_weights if col in df.columns]
+        composite, regime_codes = _risk_scores(
+            df[weight_cols].to_numpy(dtype=np.float64),
+            np.array([base_weights[col] for col in weight_cols]),
+            np.array([1.0 if col == 'STLFSI_Z' else 1.5 for col in weight_cols])
+        )
+        has_score = ~np.isnan(composite)
+        df = df.assign(Composite_Z=composite, Regime=RISK_REGIMES[regime_codes])[has_score]
+        regime_codes = regime_codes[has_score]
 
-        df["Regime"] = df.apply(classify_regime, axis=1)
-        df["Regime_shift"] = df["Regime"].ne(df["Regime"].shift(1))
+        if df.empty:
+            raise ValueError("Not enough data after composite calculation")
 
         # Aktueller Zustand
         latest = df.iloc[-1]
@@ -2196,37 +2930,38 @@ async def get_risk_radar():
                         'date': last_valid_idx.strftime('%Y-%m-%d')
                     }
 
-        # Letzte Alerts
-        alerts = df[df["Regime_shift"] & df["Regime"].isin(["WATCH", "WARNING", "ALERT"])]
-        alert_list = []
-        for idx in alerts.tail(10).index:
-            alert_list.append({
-                'date': idx.strftime('%Y-%m-%d'),
-                'composite_z': float(df.loc[idx, 'Composite_Z']),
-                'regime': df.loc[idx, 'Regime']
-            })
+        # Letzte Alerts: Regimewechsel auf WATCH oder höher, direkt auf den int8-Codes
+        regime_shift = np.empty(len(regime_codes), dtype=bool)
+        regime_shift[0] = True
+        regime_shift[1:] = regime_codes[1:] != regime_codes[:-1]
+        alert_positions = np.flatnonzero(regime_shift & (regime_codes >= RISK_WATCH_CODE))[-10:]
+        recent_alerts = df.iloc[alert_positions]
+        alert_list = [
+            {'date': date, 'composite_z': composite_z, 'regime': regime}
+            for date, composite_z, regime in zip(
+                recent_alerts.index.strftime('%Y-%m-%d').tolist(),
+                recent_alerts['Composite_Z'].tolist(),
+                recent_alerts['Regime'].tolist()
+            )
+        ]
 
         # Historische Daten für Chart (letzte 6 Monate)
         recent_df = df.tail(130)
-        historical_data = []
-        for idx in recent_df.index:
-            historical_data.append({
-                'date': idx.strftime('%Y-%m-%d'),
-                'composite_z': float(recent_df.loc[idx, 'Composite_Z']) if pd.notna(recent_df.loc[idx, 'Composite_Z']) else None,
-                'regime': recent_df.loc[idx, 'Regime']
-            })
+        historical_data = [
+            {'date': date, 'composite_z': None if np.isnan(composite_z) else composite_z, 'regime': regime}
+            for date, composite_z, regime in zip(
+                recent_df.index.strftime('%Y-%m-%d').tolist(),
+                recent_df['Composite_Z'].tolist(),
+                recent_df['Regime'].tolist()
+            )
+        ]
 
         # Regime-Statistiken (letzte 12 Monate)
         recent_stats = df.tail(252)
-        regime_counts = recent_stats["Regime"].value_counts()
         total_days = len(recent_stats)
 
-        regime_distribution = {
-            'CALM': int(regime_counts.get('CALM', 0)),
-            'WATCH': int(regime_counts.get('WATCH', 0)),
-            'WARNING': int(regime_counts.get('WARNING', 0)),
-            'ALERT': int(regime_counts.get('ALERT', 0))
-        }
+        regime_counts = np.bincount(regime_codes[-252:], minlength=len(RISK_REGIMES))
+        regime_distribution = dict(zip(RISK_REGIMES.tolist(), regime_counts.tolist()))
 
         response = {
             'status': 'success',
@@ -2258,6 +2993,7 @@ async def get_risk_radar():
         }
 
         logger.info(f"Risk Radar analysis complete: {latest['Regime']} regime")
+        _RISK_RADAR_CACHE[end_date] = response
         return response
 
     except ImportError:
@@ -2274,6 +3010,10 @@ async def get_risk_radar():
 
 @app.get("/api/sentiment")
 async def get_sentiment_data():
+    """Get Risk On/Risk Off sentiment data (yfinance calls run in a worker thread)"""
+    return await asyncio.to_thread(_build_sentiment_data)
+
+def _build_sentiment_data():
     """
     Get Risk On/Risk Off sentiment data for multiple timeframes
     Returns calculated sentiment scores based on various market indicators
@@ -2285,10 +3025,16 @@ async def get_sentiment_data():
         gold_data = None
         dxy_data = None
 
+        # One batched download for all four indicators instead of a request per ticker
+        try:
+            sentiment_hist = load_data_batch(["^VIX", "^GSPC", "GC=F", "UUP"], timeframe="1d", period="1mo")
+        except Exception as e:
+            logger.warning(f"Failed to fetch sentiment indicator data: {e}")
+            sentiment_hist = {}
+
         try:
             # Fetch VIX (Volatility Index)
-            vix = yf.Ticker("^VIX")
-            vix_hist = vix.history(period="1mo")
+            vix_hist = sentiment_hist.get("^VIX", pd.DataFrame())
             if not vix_hist.empty:
                 vix_current = vix_hist['Close'].iloc[-1]
                 vix_daily_change = ((vix_hist['Close'].iloc[-1] / vix_hist['Close'].iloc[-2]) - 1) * 100 if len(vix_hist) > 1 else 0
@@ -2306,8 +3052,7 @@ async def get_sentiment_data():
 
         try:
             # Fetch S&P 500
-            spx = yf.Ticker("^GSPC")
-            spx_hist = spx.history(period="1mo")
+            spx_hist = sentiment_hist.get("^GSPC", pd.DataFrame())
             if not spx_hist.empty:
                 spx_daily = ((spx_hist['Close'].iloc[-1] / spx_hist['Close'].iloc[-2]) - 1) * 100 if len(spx_hist) > 1 else 0
                 spx_weekly = ((spx_hist['Close'].iloc[-1] / spx_hist['Close'].iloc[-5]) - 1) * 100 if len(spx_hist) >= 5 else spx_daily
@@ -2323,8 +3068,7 @@ async def get_sentiment_data():
 
         try:
             # Fetch Gold (GC=F)
-            gold = yf.Ticker("GC=F")
-            gold_hist = gold.history(period="1mo")
+            gold_hist = sentiment_hist.get("GC=F", pd.DataFrame())
 
             if not gold_hist.empty and spx_data:
                 gold_price = gold_hist['Close'].iloc[-1]
@@ -2338,8 +3082,7 @@ async def get_sentiment_data():
 
         try:
             # Fetch DXY (US Dollar Index) - using UUP ETF as proxy
-            dxy = yf.Ticker("UUP")
-            dxy_hist = dxy.history(period="1mo")
+            dxy_hist = sentiment_hist.get("UUP", pd.DataFrame())
             if not dxy_hist.empty:
                 # Convert UUP price to approximate DXY value
                 dxy_current = dxy_hist['Close'].iloc[-1] * 4  # Rough conversion
@@ -2578,8 +3321,7 @@ async def get_seasonality(symbol: str):
                 raise HTTPException(status_code=500, detail=f"Missing column: {col}. Available: {list(hist.columns)}")
 
         # Convert to numeric
-        for col in required_cols:
-            hist[col] = pd.to_numeric(hist[col], errors='coerce')
+        hist[required_cols] = hist[required_cols].apply(pd.to_numeric, errors='coerce')
 
         # Remove NaN
         hist = hist.dropna(subset=required_cols)
@@ -2660,7 +3402,7 @@ async def get_seasonality(symbol: str):
         current_price = float(hist['Close'].iloc[-1])
 
         # Build heatmap data (Year x Month grid)
-        years = sorted(hist['Year'].unique(), reverse=True)[:10]  # Last 10 years
+        years = nlargest(10, hist['Year'].unique())  # Last 10 years
         heatmap = []
         for year in years:
             year_data = {'year': int(year)}
@@ -2755,11 +3497,110 @@ async def get_dataset(dataset_id: str):
         logger.error(f"Error loading dataset {dataset_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to load dataset: {str(e)}")
 
+# Parsed hosted datasets; like _ANALYZER_CACHE the analyzers are read-only once built.
+# LRUCache reorders on every read, so all access goes through _HOSTED_CACHE_LOCK.
+_HOSTED_ANALYZER_CACHE = LRUCache(maxsize=16)
+_HOSTED_CACHE_LOCK = threading.Lock()
+# Single-flight: one lock per dataset being parsed, concurrent misses wait for that parse
+_HOSTED_LOADING: Dict[Tuple[str, float], threading.Lock] = {}
+
+def get_hosted_analyzer(dataset_id: str) -> ProbabilityAnalyzer:
+    """Load a hosted CSV dataset into an analyzer (cached until the file changes)"""
+    # Get instrument and timeframe from dataset_id
+    parts = dataset_id.split('/')
+    instrument = parts[0] if len(parts) > 0 else "Unknown"
+    timeframe = parts[-1].split('_')[-1] if len(parts) > 1 else "Unknown"
+
+    # Construct file path
+    csv_path = os.path.join(DATA_ROOT, f"{dataset_id}.csv")
+
+    if not os.path.exists(csv_path):
+        raise HTTPException(status_code=404, detail=f"Dataset not found: {dataset_id}")
+
+    # Keyed on the file's mtime so a replaced dataset is re-parsed
+    key = (dataset_id, os.path.getmtime(csv_path))
+    with _HOSTED_CACHE_LOCK:
+        analyzer = _HOSTED_ANALYZER_CACHE.get(key)
+        if analyzer is not None:
+            return analyzer
+        load_lock = _HOSTED_LOADING.setdefault(key, threading.Lock())
+
+    with load_lock:
+        with _HOSTED_CACHE_LOCK:
+            analyzer = _HOSTED_ANALYZER_CACHE.get(key)
+        if analyzer is not None:
+            return analyzer  # parsed by the request we waited for
+        try:
+            analyzer = _parse_hosted_dataset(csv_path, instrument, timeframe)
+            with _HOSTED_CACHE_LOCK:
+                _HOSTED_ANALYZER_CACHE[key] = analyzer
+        finally:
+            with _HOSTED_CACHE_LOCK:
+                if _HOSTED_LOADING.get(key) is load_lock:
+                    del _HOSTED_LOADING[key]
+    return analyzer
+
+def _parse_hosted_dataset(csv_path: str, instrument: str, timeframe: str) -> ProbabilityAnalyzer:
+    """Parse a hosted CSV dataset and wrap it in an analyzer"""
+    # Load CSV (try tab-separated first, then comma-separated)
+    # Your datasets use tab-separated format with extra trailing tabs
+    try:
+        df = pd.read_csv(csv_path, sep='\t', header=0, index_col=False)
+    except:
+        try:
+            df = pd.read_csv(csv_path)
+        except Exception as e:
+            logger.error(f"Failed to load CSV: {str(e)}")
+            raise HTTPException(status_code=400, detail=f"Failed to parse CSV file: {str(e)}")
+
+    # Process data to match yfinance format
+    # Detect Time column (could be 'Time', 'time', 'Date', etc.)
+    time_col = None
+    for col in ['Time', 'time', 'Date', 'date', 'timestamp', 'Timestamp']:
+        if col in df.columns:
+            time_col = col
+            break
+
+    if time_col is None:
+        # Log available columns for debugging
+        logger.error(f"Available columns: {list(df.columns)}")
+        raise HTTPException(status_code=400, detail=f"No time column found in dataset. Available columns: {list(df.columns)}")
+
+    # Rename to standard format
+    df = df.rename(columns={time_col: 'Date'})
+    df['Date'] = pd.to_datetime(df['Date'])
+    df.set_index('Date', inplace=True)
+    df.sort_index(inplace=True)
+
+    # Ensure OHLC columns exist
+    required_cols = ['Open', 'High', 'Low', 'Close']
+    for col in required_cols:
+        if col not in df.columns:
+            raise HTTPException(status_code=400, detail=f"Missing required column: {col}")
+
+    # Convert to numeric
+    df[required_cols] = df[required_cols].apply(pd.to_numeric, errors='coerce')
+
+    # Remove NaN rows
+    df = df.dropna(subset=required_cols)
+
+    if len(df) < 10:
+        raise HTTPException(
+            status_code=400,
+            detail="Nicht genügend historische Daten verfügbar"
+        )
+
+    # Add candle types (required for analysis)
+    df['Candle_Type'] = classify_candles(df['Close'].to_numpy() - df['Open'].to_numpy())
+
+    # Initialize analyzer and set data directly
+    analyzer = ProbabilityAnalyzer()
+    analyzer.set_data(df, instrument, timeframe)
+    return analyzer
+
 @app.post("/api/analyze/hosted")
 async def analyze_hosted_dataset(request: Dict[str, Any]):
     """Analyze a hosted dataset without requiring file upload"""
-    global analyzer_instance
-
     try:
         dataset_id = request.get('dataset_id')
         pattern = request.get('pattern')
@@ -2769,83 +3610,14 @@ async def analyze_hosted_dataset(request: Dict[str, Any]):
         if not pattern:
             raise HTTPException(status_code=400, detail="pattern is required")
 
-        # Get instrument and timeframe from dataset_id
-        parts = dataset_id.split('/')
-        instrument = parts[0] if len(parts) > 0 else "Unknown"
-        timeframe = parts[-1].split('_')[-1] if len(parts) > 1 else "Unknown"
-
         logger.info(f"Analyzing hosted dataset: {dataset_id} with pattern {pattern}")
 
-        # Construct file path
-        csv_path = os.path.join(DATA_ROOT, f"{dataset_id}.csv")
-
-        if not os.path.exists(csv_path):
-            raise HTTPException(status_code=404, detail=f"Dataset not found: {dataset_id}")
-
-        # Load CSV (try tab-separated first, then comma-separated)
-        # Your datasets use tab-separated format with extra trailing tabs
-        try:
-            df = pd.read_csv(csv_path, sep='\t', header=0, index_col=False)
-        except:
-            try:
-                df = pd.read_csv(csv_path)
-            except Exception as e:
-                logger.error(f"Failed to load CSV: {str(e)}")
-                raise HTTPException(status_code=400, detail=f"Failed to parse CSV file: {str(e)}")
-
-        # Process data to match yfinance format
-        # Detect Time column (could be 'Time', 'time', 'Date', etc.)
-        time_col = None
-        for col in ['Time', 'time', 'Date', 'date', 'timestamp', 'Timestamp']:
-            if col in df.columns:
-                time_col = col
-                break
-
-        if time_col is None:
-            # Log available columns for debugging
-            logger.error(f"Available columns: {list(df.columns)}")
-            raise HTTPException(status_code=400, detail=f"No time column found in dataset. Available columns: {list(df.columns)}")
-
-        # Rename to standard format
-        df = df.rename(columns={time_col: 'Date'})
-        df['Date'] = pd.to_datetime(df['Date'])
-        df.set_index('Date', inplace=True)
-        df.sort_index(inplace=True)
-
-        # Ensure OHLC columns exist
-        required_cols = ['Open', 'High', 'Low', 'Close']
-        for col in required_cols:
-            if col not in df.columns:
-                raise HTTPException(status_code=400, detail=f"Missing required column: {col}")
-
-        # Convert to numeric
-        for col in required_cols:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-
-        # Remove NaN rows
-        df = df.dropna(subset=required_cols)
-
-        if len(df) < 10:
-            raise HTTPException(
-                status_code=400,
-                detail="Nicht genügend historische Daten verfügbar"
-            )
-
-        # Initialize analyzer and set data directly
-        analyzer_instance = ProbabilityAnalyzer()
-        analyzer_instance.data = df
-        analyzer_instance.symbol = instrument
-        analyzer_instance.timeframe = timeframe
-
-        # Add candle types (required for analysis)
-        analyzer_instance.data['Candle_Type'] = analyzer_instance.data.apply(
-            lambda row: 'Bullish' if row['Close'] > row['Open']
-            else ('Bearish' if row['Close'] < row['Open'] else 'Doji'),
-            axis=1
-        )
+        # Parsed datasets are cached per file version; loading runs off the event loop
+        analyzer = await asyncio.to_thread(get_hosted_analyzer, dataset_id)
+        df = analyzer.data
 
         # Calculate probabilities using existing logic
-        results = analyzer_instance.calculate_probabilities(pattern)
+        results = await asyncio.to_thread(analyzer.calculate_probabilities, pattern)
 
         # Prepare response (same format as /api/analyze)
         response = {
@@ -2855,8 +3627,8 @@ async def analyze_hosted_dataset(request: Dict[str, Any]):
             'next_bearish': results['next_bearish'],
             'bullish_probability': round(results['bullish_probability'], 2),
             'bearish_probability': round(results['bearish_probability'], 2),
-            'symbol': instrument,
-            'timeframe': timeframe,
+            'symbol': analyzer.symbol,
+            'timeframe': analyzer.timeframe,
             'pattern': pattern,
             'data_info': {
                 'total_candles': len(df),
@@ -2864,11 +3636,7 @@ async def analyze_hosted_dataset(request: Dict[str, Any]):
                     'start': df.index[0].strftime('%Y-%m-%d'),
                     'end': df.index[-1].strftime('%Y-%m-%d')
                 },
-                'candle_types': {
-                    'bullish': int(sum(df['Candle_Type'] == 'Bullish')),
-                    'bearish': int(sum(df['Candle_Type'] == 'Bearish')),
-                    'doji': int(sum(df['Candle_Type'] == 'Doji'))
-                }
+                'candle_types': analyzer.candle_counts()
             }
         }
 
@@ -2892,8 +3660,6 @@ async def get_intraday_screener(current_user: User = Depends(get_current_active_
     Returns last 24 hours of minute data
     """
     try:
-        import requests
-
         # Polygon.io API key from environment
         polygon_api_key = os.environ.get("POLYGON_API_KEY", "")
 
@@ -2911,7 +3677,6 @@ async def get_intraday_screener(current_user: User = Depends(get_current_active_
 
         # Time range: today and yesterday (to ensure we get latest data)
         # Use UTC+1 for European timezone
-        from datetime import timezone
         now_utc = datetime.now(timezone.utc)
         end_date = now_utc + timedelta(days=1)  # Tomorrow to ensure we get all of today
         start_date = now_utc - timedelta(days=1)  # Yesterday
@@ -2936,13 +3701,13 @@ async def get_intraday_screener(current_user: User = Depends(get_current_active_
                 }
 
                 logger.info(f"Fetching {symbol_key} from Polygon.io: {polygon_symbol}, URL: {url}")
-                response = requests.get(url, params=params, timeout=30)
+                response = _HTTP.get(url, params=params, timeout=30)
 
                 if response.status_code != 200:
                     logger.warning(f"Polygon.io returned {response.status_code} for {symbol_key}: {response.text[:200]}")
                     continue
 
-                data = response.json()
+                data = orjson.loads(response.content)
 
                 # Log ticker info
                 logger.info(f"{symbol_key} response: ticker={data.get('ticker')}, status={data.get('status')}, resultsCount={data.get('resultsCount')}")
@@ -3059,30 +3824,55 @@ async def health_check():
     }
 
 # Serve static HTML files
+# The pages only change with a deploy: read and gzip them once at startup, revalidate via ETag
+HTML_PAGES = ("index.html", "login.html", "terminal.html", "admin.html")
+HTML_CACHE_CONTROL = "public, max-age=300"
+_HTML_CACHE: Dict[str, Tuple[bytes, bytes, str]] = {}
+
+def load_html_pages():
+    """Fill _HTML_CACHE with (content, gzipped content, ETag) per page"""
+    for name in HTML_PAGES:
+        try:
+            with open(name, "rb") as f:
+                content = f.read()
+        except OSError as e:
+            logger.warning(f"Could not load {name}: {e}")
+            continue
+        etag = '"' + hashlib.blake2b(content, digest_size=16).hexdigest() + '"'
+        _HTML_CACHE[name] = (content, gzip.compress(content, GZIP_LEVEL), etag)
+
+def _html_response(name: str, if_none_match: Optional[str], accept_encoding: Optional[str]) -> Response:
+    """Serve a cached HTML page"""
+    if name not in _HTML_CACHE:
+        raise HTTPException(status_code=404, detail=f"{name} not found")
+    content, content_gz, etag = _HTML_CACHE[name]
+    return _static_response(content, content_gz, etag, if_none_match, accept_encoding,
+                            media_type="text/html", cache_control=HTML_CACHE_CONTROL)
+
 @app.get("/")
-async def read_root():
+async def read_root(if_none_match: Optional[str] = Header(None), accept_encoding: Optional[str] = Header(None)):
     """Serve landing page"""
-    return FileResponse("index.html")
+    return _html_response("index.html", if_none_match, accept_encoding)
 
 @app.get("/login.html")
-async def read_login():
+async def read_login(if_none_match: Optional[str] = Header(None), accept_encoding: Optional[str] = Header(None)):
     """Serve login page"""
-    return FileResponse("login.html")
+    return _html_response("login.html", if_none_match, accept_encoding)
 
 @app.get("/terminal.html")
-async def read_terminal():
+async def read_terminal(if_none_match: Optional[str] = Header(None), accept_encoding: Optional[str] = Header(None)):
     """Serve terminal interface"""
-    return FileResponse("terminal.html")
+    return _html_response("terminal.html", if_none_match, accept_encoding)
 
 @app.get("/admin.html")
-async def read_admin():
+async def read_admin(if_none_match: Optional[str] = Header(None), accept_encoding: Optional[str] = Header(None)):
     """Serve admin panel"""
-    return FileResponse("admin.html")
+    return _html_response("admin.html", if_none_match, accept_encoding)
 
 @app.get("/index.html")
-async def read_index():
+async def read_index(if_none_match: Optional[str] = Header(None), accept_encoding: Optional[str] = Header(None)):
     """Serve index page"""
-    return FileResponse("index.html")
+    return _html_response("index.html", if_none_match, accept_encoding)
 
 if __name__ == "__main__":
     # Auto-create admin user on Railway deployment
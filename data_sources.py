@@ -8,6 +8,7 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import logging
+import random
 import time
 import os
 from demo_data_generator import PREGENERATED_DATA, get_demo_data
@@ -17,6 +18,14 @@ logger = logging.getLogger(__name__)
 # Path to hosted CSV datasets
 DATA_ROOT = os.environ.get("DATA_ROOT_PATH", "data/datasets")
 
+# Browser User-Agents rotated across Yahoo requests to avoid being blocked
+USER_AGENTS = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:122.0) Gecko/20100101 Firefox/122.0'
+]
+
 class DataSourceManager:
     """Manages multiple data sources with automatic fallback"""
 
@@ -139,9 +148,8 @@ class DataSourceManager:
             df.sort_index(inplace=True)
 
             # Convert string values to float
-            for col in ['open', 'high', 'low', 'close', 'volume']:
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
+            cols = [col for col in ['open', 'high', 'low', 'close', 'volume'] if col in df.columns]
+            df[cols] = df[cols].apply(pd.to_numeric, errors='coerce')
 
             # Rename columns
             df = df.rename(columns={
@@ -256,8 +264,7 @@ class DataSourceManager:
                 })
 
             # Convert to numeric
-            for col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
+            df = df.apply(pd.to_numeric, errors='coerce')
 
             logger.info(f"✅ Alpha Vantage: {len(df)} records for {symbol}")
             return df[['Open', 'High', 'Low', 'Close', 'Volume']]
@@ -387,6 +394,22 @@ class DataSourceManager:
 data_source_manager = DataSourceManager()
 
 
+def fetch_yfinance_history(symbol: str, period: str = "5d") -> pd.DataFrame:
+    """
+    Download recent history via yfinance. Runs inside a worker process
+    (module-level so it pickles), which keeps yfinance's parsing off the server's GIL.
+    """
+    import yfinance as yf
+
+    session = requests.Session()
+    session.headers.update({
+        'User-Agent': random.choice(USER_AGENTS),
+        'Accept': 'application/json',
+        'Accept-Language': 'en-US,en;q=0.9',
+    })
+    return yf.Ticker(symbol, session=session).history(period=period, timeout=10)
+
+
 def get_historical_data(symbol: str):
     """
     Main function to get historical data with automatic fallback
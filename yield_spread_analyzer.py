@@ -15,7 +15,6 @@ import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 import logging
-import yfinance as yf
 from scipy import stats
 from scipy.stats import zscore
 import requests
@@ -156,6 +155,8 @@ class YieldSpreadAnalyzer:
 
         # Fallback to yfinance (may be blocked on some servers)
         try:
+            import yfinance as yf  # fallback only - keep it off the import path
+
             logger.info("Attempting to fetch US Treasury yields from yfinance...")
             data = {}
 
@@ -442,6 +443,8 @@ class YieldSpreadAnalyzer:
 
         # Fallback to yfinance (may be blocked on some servers)
         try:
+            import yfinance as yf  # fallback only - keep it off the import path
+
             logger.info("Attempting to fetch FX data from yfinance...")
             data = {}
 